@@ -0,0 +1,269 @@
+"""Almacén local y durable de assessments completados (SQLite en modo WAL).
+
+Cada assessment que llega a la página de resultados se guarda con industria,
+tamaño, selección (máscaras y claves de catálogo), puntaje por función NIST,
+puntaje global y nivel. La interfaz solo encola el registro: un hilo escritor
+lo agrupa con otros y los confirma en lotes (hasta NIST_STORE_BATCH_SIZE filas
+o NIST_STORE_FLUSH_SECONDS de espera), así que el rerun nunca espera al disco.
+Después de cada lote confirmado se avisa a los agregados en streaming
+(`on_commit`) con los puntajes y el id asignado a cada fila.
+"""
+import atexit
+import json
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from catalog import NIST_FUNCTIONS, CompiledCatalog
+from scoring import AssessmentResults
+
+STORE_PATH = os.environ.get("NIST_ASSESSMENT_DB", "assessments.db")
+BATCH_SIZE = int(os.environ.get("NIST_STORE_BATCH_SIZE", "256"))
+FLUSH_SECONDS = float(os.environ.get("NIST_STORE_FLUSH_SECONDS", "0.5"))
+# Registros en espera como máximo; si el disco no da abasto se descartan en vez de frenar la interfaz
+MAX_PENDING = int(os.environ.get("NIST_STORE_MAX_PENDING", "10000"))
+
+FUNCTION_COLUMNS = [function.lower() for function in NIST_FUNCTIONS]
+
+SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS assessments (
+        id INTEGER PRIMARY KEY,
+        created_at REAL NOT NULL,
+        industry TEXT,
+        company_size TEXT,
+        catalog_version TEXT NOT NULL,
+        product_mask TEXT NOT NULL,
+        third_party_mask TEXT NOT NULL,
+        products TEXT NOT NULL,
+        third_party TEXT NOT NULL,
+        {", ".join(f"{column} REAL NOT NULL" for column in FUNCTION_COLUMNS)},
+        overall_score REAL NOT NULL,
+        maturity_level INTEGER NOT NULL
+    )
+    """,
+    # Las consultas de analítica filtran por segmento y rango de fechas
+    "CREATE INDEX IF NOT EXISTS idx_assessments_segment ON assessments (industry, company_size, created_at)"
+]
+
+INSERT_COLUMNS = (["created_at", "industry", "company_size", "catalog_version", "product_mask", "third_party_mask",
+                   "products", "third_party"] + FUNCTION_COLUMNS + ["overall_score", "maturity_level"])
+INSERT_SQL = (f"INSERT INTO assessments ({', '.join(INSERT_COLUMNS)}) "
+              f"VALUES ({', '.join('?' for _ in INSERT_COLUMNS)})")
+
+class AssessmentRecord(NamedTuple):
+    created_at: float
+    industry: Optional[str]
+    company_size: Optional[str]
+    catalog_version: str
+    product_mask: int
+    third_party_mask: int
+    products: List[str]
+    third_party: List[str]
+    function_scores: Dict[str, float]
+    overall_score: float
+    maturity_level: int
+
+    def row(self) -> tuple:
+        return (
+            self.created_at, self.industry, self.company_size, self.catalog_version,
+            # Máscaras en hexadecimal: SQLite no guarda enteros de más de 64 bits
+            format(self.product_mask, "x"), format(self.third_party_mask, "x"),
+            json.dumps(self.products, ensure_ascii=False), json.dumps(self.third_party, ensure_ascii=False),
+            *(self.function_scores[function] for function in NIST_FUNCTIONS),
+            self.overall_score, self.maturity_level
+        )
+
+def build_record(results: AssessmentResults, industry: Optional[str], company_size: Optional[str],
+                 catalog: CompiledCatalog) -> AssessmentRecord:
+    """Registro de un assessment completado; las claves de catálogo lo mantienen legible si el catálogo cambia"""
+    return AssessmentRecord(
+        created_at=time.time(),
+        industry=industry,
+        company_size=company_size,
+        catalog_version=catalog.version,
+        product_mask=results.product_mask,
+        third_party_mask=results.third_party_mask,
+        products=[catalog.product_keys[index] for index, implemented in enumerate(results.implemented) if implemented],
+        third_party=[coverage.category for coverage in results.category_coverage if coverage.has_third_party],
+        function_scores=dict(results.function_scores),
+        overall_score=results.overall_score,
+        maturity_level=results.maturity_level
+    )
+
+class StoredScores(NamedTuple):
+    """Puntajes de una fila confirmada, lo que necesitan los agregados por segmento"""
+    id: int
+    industry: Optional[str]
+    company_size: Optional[str]
+    function_scores: Dict[str, float]
+    overall_score: float
+
+CommitListener = Callable[[List[StoredScores]], None]
+
+def connect(path: str = STORE_PATH) -> sqlite3.Connection:
+    """Conexión con el esquema creado; WAL permite leer mientras el hilo escritor confirma"""
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # En WAL, NORMAL solo sincroniza en los checkpoints: un corte de luz puede perder el último lote, nunca corromper
+    connection.execute("PRAGMA synchronous=NORMAL")
+    with connection:
+        for statement in SCHEMA:
+            connection.execute(statement)
+    return connection
+
+def connect_readonly(path: str = STORE_PATH) -> sqlite3.Connection:
+    """Conexión de solo lectura: no crea el esquema ni cambia el modo del journal (eso queda en el escritor)"""
+    return sqlite3.connect(f"{pathlib.Path(path).resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+
+def iter_scores(path: str = STORE_PATH, after_id: int = 0) -> Iterator[StoredScores]:
+    """Puntajes confirmados con id mayor a `after_id`, en orden de id (recorre la clave primaria)"""
+    if not os.path.exists(path):
+        return
+    connection = connect_readonly(path)
+    try:
+        try:
+            rows = connection.execute(
+                f"SELECT id, industry, company_size, {', '.join(FUNCTION_COLUMNS)}, overall_score "
+                f"FROM assessments WHERE id > ? ORDER BY id", (after_id,)
+            )
+        except sqlite3.OperationalError:
+            # Base creada pero el escritor todavía no confirmó el esquema: no hay puntajes
+            if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'assessments'").fetchone():
+                raise
+            return
+        for row in rows:
+            yield StoredScores(row[0], row[1], row[2], dict(zip(NIST_FUNCTIONS, row[3:-1])), row[-1])
+    finally:
+        connection.close()
+
+class _Flush(NamedTuple):
+    done: threading.Event
+
+_STOP = object()
+
+class AssessmentStore:
+    """Cola en memoria más un hilo escritor que confirma los registros en lotes"""
+    def __init__(self, path: str = STORE_PATH, batch_size: int = BATCH_SIZE, flush_seconds: float = FLUSH_SECONDS,
+                 max_pending: int = MAX_PENDING):
+        self.path = path
+        self.batch_size = max(batch_size, 1)
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(max_pending, 1))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[CommitListener] = []
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+        self.last_error: Optional[str] = None
+
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="nist-assessment-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def on_commit(self, listener: CommitListener):
+        """Registra `listener(filas)`, llamado desde el hilo escritor después de cada lote confirmado"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def record(self, record: AssessmentRecord) -> bool:
+        """Encola sin bloquear; False si la cola está llena y el registro se descartó"""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """Espera a que se confirme todo lo encolado hasta ahora (benchmarks, apagado)"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(_Flush(done))
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        connection = None
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.flush_seconds
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, _Flush):
+                    waiters.append(item.done)
+                else:
+                    batch.append(item)
+                if stopping or waiters or len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    if connection is None:
+                        connection = connect(self.path)
+                    # Un INSERT por fila dentro de la misma transacción: un solo commit y el id de cada fila
+                    with connection:
+                        ids = [connection.execute(INSERT_SQL, record.row()).lastrowid for record in batch]
+                    with self._lock:
+                        self.written += len(batch)
+                        self.batches += 1
+                        listeners = list(self._listeners)
+                    committed = [StoredScores(row_id, record.industry, record.company_size, record.function_scores,
+                                              record.overall_score) for row_id, record in zip(ids, batch)]
+                    for listener in listeners:
+                        listener(committed)
+                except sqlite3.Error as exc:
+                    # Un lote que falla no detiene al escritor: se cuenta y se sigue con el próximo
+                    with self._lock:
+                        self.failed += len(batch)
+                        self.last_error = f"{type(exc).__name__}: {exc}"
+                except Exception as exc:
+                    # Un agregado que falla tampoco: las filas ya están confirmadas
+                    with self._lock:
+                        self.last_error = f"{type(exc).__name__}: {exc}"
+            for done in waiters:
+                done.set()
+        if connection is not None:
+            connection.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "written": self.written,
+                "batches": self.batches,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "error": self.last_error
+            }
+
+ASSESSMENT_STORE = AssessmentStore()
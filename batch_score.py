@@ -0,0 +1,219 @@
+"""Scoring batch sin interfaz para archivos de assessments en JSONL o CSV.
+
+Cada fila trae industria, tamaño de empresa, productos Fortinet implementados y
+categorías con soluciones de terceros. Las filas se agrupan en bloques que se
+puntúan en un pool de procesos con el mismo kernel que usa la aplicación; los
+resultados se escriben en orden a medida que llegan y un checkpoint permite
+retomar una corrida interrumpida.
+
+Uso:
+    python batch_score.py assessments.jsonl -o resultados.jsonl --workers 8
+    python batch_score.py assessments.csv -o resultados.csv --resume
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from catalog import NIST_FUNCTIONS, current_catalog
+from scoring import score_selection_matrix
+
+OUTPUT_FIELDS = ["id", "industry", "company_size"] + NIST_FUNCTIONS + ["overall_score", "maturity_level", "error"]
+
+def split_list_field(value) -> List[str]:
+    """Acepta listas JSON o cadenas separadas por ';' (formato CSV)"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(";") if item.strip()]
+    return list(value)
+
+def parse_record(raw, input_format: str, header: List[str]) -> Dict:
+    if input_format == "jsonl":
+        return json.loads(raw)
+    return dict(zip(header, raw))
+
+def score_chunk(raw_records: List, input_format: str, header: List[str], output_format: str,
+                catalog_version: str) -> Tuple[str, int, int]:
+    """Puntúa un bloque de filas crudas y devuelve el bloque ya serializado"""
+    catalog = current_catalog()
+    if catalog.version != catalog_version:
+        # Toda la corrida se puntúa con la misma versión del catálogo
+        raise RuntimeError(f"El catálogo cambió durante la corrida ({catalog_version} → {catalog.version})")
+    records = []
+    products = np.zeros((len(raw_records), catalog.n_products), dtype=bool)
+    third_party = np.zeros((len(raw_records), catalog.n_categories), dtype=bool)
+
+    for i, raw in enumerate(raw_records):
+        record = {"id": None, "industry": None, "company_size": None, "error": None}
+        try:
+            row = parse_record(raw, input_format, header)
+            record.update(id=row.get("id"), industry=row.get("industry"), company_size=row.get("company_size"))
+            for product in split_list_field(row.get("products")):
+                if product not in catalog.product_lookup:
+                    raise ValueError(f"Producto desconocido: {product}")
+                products[i, catalog.product_lookup[product]] = True
+            for category in split_list_field(row.get("third_party")):
+                if category not in catalog.category_position:
+                    raise ValueError(f"Categoría desconocida: {category}")
+                third_party[i, catalog.category_position[category]] = True
+        except (ValueError, TypeError, AttributeError) as exc:
+            record["error"] = str(exc)
+        records.append(record)
+
+    function_scores, overall_score, maturity_level = score_selection_matrix(products, third_party, catalog)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n") if output_format == "csv" else None
+    errors = 0
+    for i, record in enumerate(records):
+        if record["error"] is None:
+            for j, function in enumerate(NIST_FUNCTIONS):
+                record[function] = round(float(function_scores[i, j]), 4)
+            record["overall_score"] = round(float(overall_score[i]), 4)
+            record["maturity_level"] = int(maturity_level[i])
+        else:
+            errors += 1
+        if writer:
+            writer.writerow(["" if record.get(field) is None else record[field] for field in OUTPUT_FIELDS])
+        else:
+            buffer.write(json.dumps({field: record.get(field) for field in OUTPUT_FIELDS}, ensure_ascii=False))
+            buffer.write("\n")
+    return buffer.getvalue(), len(records), errors
+
+def detect_format(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+def iter_chunks(handle, input_format: str, chunk_size: int, skip: int) -> Iterator[List]:
+    """Lee el archivo en streaming; nunca mantiene más de un bloque en memoria"""
+    if input_format == "csv":
+        rows = csv.reader(handle)
+    else:
+        rows = (line for line in handle if line.strip())
+
+    chunk = []
+    for position, raw in enumerate(rows):
+        if position < skip:
+            continue
+        chunk.append(raw)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def load_checkpoint(path: str, input_path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as handle:
+        checkpoint = json.load(handle)
+    if checkpoint.get("input") != os.path.abspath(input_path):
+        raise SystemExit(f"El checkpoint {path} pertenece a otro archivo de entrada")
+    return checkpoint
+
+def save_checkpoint(path: str, checkpoint: Dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(checkpoint, handle)
+    os.replace(tmp_path, path)
+
+def run(args) -> int:
+    input_format = args.input_format or detect_format(args.input)
+    output_format = args.output_format or detect_format(args.output)
+    checkpoint_path = args.checkpoint or args.output + ".ckpt"
+    catalog_version = current_catalog().version
+
+    checkpoint = load_checkpoint(checkpoint_path, args.input) if args.resume else {}
+    if checkpoint.get("catalog_version", catalog_version) != catalog_version:
+        raise SystemExit(f"El checkpoint {checkpoint_path} se generó con otra versión del catálogo")
+    if checkpoint and (not os.path.exists(args.output)
+                       or os.path.getsize(args.output) < checkpoint["output_offset"]):
+        # Sin la salida que cubre el checkpoint no hay de dónde retomar: se empieza de nuevo desde la fila 0
+        print(f"La salida {args.output} no existe o está incompleta: se descarta el checkpoint y se empieza "
+              f"desde la primera fila", file=sys.stderr)
+        os.remove(checkpoint_path)
+        checkpoint = {}
+    rows_done = checkpoint.get("rows_done", 0)
+    errors_total = checkpoint.get("errors", 0)
+
+    # Al retomar se descarta cualquier salida escrita después del último checkpoint
+    output = open(args.output, "r+" if checkpoint else "w", encoding="utf-8", newline="")
+    if checkpoint:
+        output.seek(checkpoint["output_offset"])
+        output.truncate()
+
+    with open(args.input, encoding="utf-8", newline="") as source, output:
+        header = []
+        if input_format == "csv":
+            header = next(csv.reader([source.readline()]))
+        if output_format == "csv" and not checkpoint:
+            csv.writer(output, lineterminator="\n").writerow(OUTPUT_FIELDS)
+
+        started = time.monotonic()
+        rows_this_run = 0
+        pending = deque()
+        executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 0 else None
+
+        def write_result(result):
+            nonlocal rows_done, errors_total, rows_this_run
+            block, rows, errors = result
+            output.write(block)
+            output.flush()
+            os.fsync(output.fileno())
+            rows_done += rows
+            rows_this_run += rows
+            errors_total += errors
+            save_checkpoint(checkpoint_path, {
+                "input": os.path.abspath(args.input),
+                "rows_done": rows_done,
+                "errors": errors_total,
+                "output_offset": output.tell(),
+                "catalog_version": catalog_version
+            })
+            elapsed = max(time.monotonic() - started, 1e-9)
+            print(f"\r{rows_done:,} filas | {errors_total:,} errores | {rows_this_run / elapsed:,.0f} filas/s",
+                  end="", file=sys.stderr, flush=True)
+
+        try:
+            for chunk in iter_chunks(source, input_format, args.chunk_size, rows_done):
+                if executor is None:
+                    write_result(score_chunk(chunk, input_format, header, output_format, catalog_version))
+                    continue
+                pending.append(executor.submit(score_chunk, chunk, input_format, header, output_format,
+                                               catalog_version))
+                # Ventana acotada de bloques en vuelo: la memoria no crece con el archivo
+                while len(pending) >= max(args.max_pending, 1):
+                    write_result(pending.popleft().result())
+            while pending:
+                write_result(pending.popleft().result())
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    print(file=sys.stderr)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    workers = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Scoring NIST batch sobre archivos JSONL/CSV")
+    parser.add_argument("input", help="Archivo de entrada (.jsonl o .csv)")
+    parser.add_argument("-o", "--output", required=True, help="Archivo de salida (.jsonl o .csv)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"], help="Por defecto según la extensión")
+    parser.add_argument("--output-format", choices=["jsonl", "csv"], help="Por defecto según la extensión")
+    parser.add_argument("--workers", type=int, default=workers, help="Procesos del pool (0 = en el proceso actual)")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="Filas por bloque")
+    parser.add_argument("--max-pending", type=int, default=2 * workers, help="Bloques en vuelo como máximo")
+    parser.add_argument("--checkpoint", help="Archivo de checkpoint (por defecto <output>.ckpt)")
+    parser.add_argument("--resume", action="store_true", help="Retomar desde el checkpoint existente")
+    return parser
+
+if __name__ == "__main__":
+    sys.exit(run(build_parser().parse_args()))
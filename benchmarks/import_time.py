@@ -0,0 +1,136 @@
+"""Arranque en frío: cuánto tarda un proceso nuevo en tener listo el paso 1 del wizard.
+
+Cada repetición corre en un intérprete nuevo con `-X importtime` e importa main.py
+en modo "bare" (sin servidor), lo que incluye el primer run del script hasta el
+paso 1. Se informa la mediana del tiempo total, qué módulos pesados quedaron
+cargados y el tiempo propio de cada módulo sumado por paquete de primer nivel
+(así el costo de pandas o plotly no queda escondido dentro de main). Aparte se
+mide lo que agrega el stack de resultados que se importa al llegar al paso 4.
+
+Uso:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 9 --top 15 -o import.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Módulos que los pasos 1-3 no deberían necesitar
+HEAVY_MODULES = ["pandas", "pyarrow", "plotly.express", "plotly.subplots", "roadmap_chart"]
+
+STEP1_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed_ms": elapsed * 1000, "loaded": [name for name in HEAVY if name in sys.modules]}))
+"""
+
+# Lo que agrega el paso 4: el stack de resultados que ahora se importa al llegar a él
+RESULTS_CHILD = """
+import json, sys, time
+import main
+print(MARKER, file=sys.stderr, flush=True)
+start = time.perf_counter()
+import pandas, plotly.graph_objects, roadmap_chart
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed_ms": elapsed * 1000, "loaded": [name for name in HEAVY if name in sys.modules]}))
+"""
+
+MARKER = "--- importtime: resultados ---"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+\d+ \| *(\S+)")
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Tiempo propio en ms sumado por paquete de primer nivel; solo lo posterior al marcador si lo hay"""
+    if MARKER in stderr:
+        stderr = stderr.split(MARKER, 1)[1]
+    totals: Dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            totals[match.group(2).split(".")[0]] += int(match.group(1)) / 1000
+    return dict(totals)
+
+def run_child(code: str) -> Dict:
+    env = dict(os.environ, STREAMLIT_LOG_LEVEL="error")
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"HEAVY = {HEAVY_MODULES!r}\nMARKER = {MARKER!r}\n{code}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    report["wall_ms"] = wall_ms
+    report["packages"] = parse_importtime(completed.stderr)
+    return report
+
+def summarize(reports: List[Dict], top: int) -> Dict:
+    packages: Dict[str, List[float]] = defaultdict(list)
+    for report in reports:
+        for name, ms in report["packages"].items():
+            packages[name].append(ms)
+    package_medians = sorted(
+        ((name, statistics.median(values)) for name, values in packages.items()),
+        key=lambda item: item[1], reverse=True
+    )
+    return {
+        "runs": len(reports),
+        "wall_ms": round(statistics.median(report["wall_ms"] for report in reports), 1),
+        "elapsed_ms": round(statistics.median(report["elapsed_ms"] for report in reports), 1),
+        "heavy_loaded": reports[-1]["loaded"],
+        "top_packages": [{"package": name, "self_ms": round(ms, 1)} for name, ms in package_medians[:top]]
+    }
+
+def print_summary(title: str, summary: Dict):
+    print(f"\n{title}: {summary['elapsed_ms']:,.1f} ms en proceso, {summary['wall_ms']:,.1f} ms de pared "
+          f"(mediana de {summary['runs']})", file=sys.stderr)
+    print(f"  pesados cargados: {', '.join(summary['heavy_loaded']) or 'ninguno'}", file=sys.stderr)
+    for row in summary["top_packages"]:
+        print(f"  {row['package']:<28} {row['self_ms']:>10,.1f} ms", file=sys.stderr)
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform()}
+
+def run(args) -> int:
+    step1 = summarize([run_child(STEP1_CHILD) for _ in range(args.repeat)], args.top)
+    print_summary("Paso 1 (import main)", step1)
+    results = summarize([run_child(RESULTS_CHILD) for _ in range(args.repeat)], args.top)
+    print_summary("Stack de resultados (paso 4)", results)
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("import-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump({
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "environment": environment(),
+            "step1": step1,
+            "results_stack": results
+        }, handle, ensure_ascii=False, indent=2)
+    print(f"\nResultados en {output}", file=sys.stderr)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Tiempo de importación en frío del assessment NIST")
+    parser.add_argument("--repeat", type=int, default=5, help="Procesos nuevos por medición")
+    parser.add_argument("--top", type=int, default=10, help="Paquetes de primer nivel a listar")
+    parser.add_argument("-o", "--output", help="Archivo JSON (por defecto benchmarks/results/import-<fecha>.json)")
+    return parser
+
+if __name__ == "__main__":
+    sys.exit(run(build_parser().parse_args()))
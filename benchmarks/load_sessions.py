@@ -0,0 +1,453 @@
+"""Generador de carga con sesiones concurrentes contra un servidor local de Streamlit.
+
+Levanta `streamlit run serve.py` (o se conecta a un servidor existente con --url)
+y abre cientos de sesiones por el websocket /_stcore/stream, hablando el mismo
+protocolo protobuf que el navegador: cada rerun es un BackMsg rerun_script con
+el estado de los widgets y termina con el ForwardMsg script_finished. Cada
+sesión recorre el wizard como un ingeniero de ventas (industria, tamaño, ráfagas
+de clics en la grilla del paso 3 y resultados en el paso 4).
+
+Por cada nivel de concurrencia se reportan los percentiles de latencia por paso,
+la tasa de errores y el RSS/CPU del servidor (leídos de /proc), y se indica el
+primer nivel en que el p95 de show_professional_results excede el SLO.
+
+Uso:
+    python benchmarks/load_sessions.py --levels 10 50 100 200
+    python benchmarks/load_sessions.py --levels 25 --iterations 3 --toggles 15 --json carga.json
+    python benchmarks/load_sessions.py --url ws://127.0.0.1:8501 --pid 12345 --levels 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List, Optional
+
+from websockets.asyncio.client import connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from catalog import current_catalog
+from selection_grid import GRID_KEY, encode_selection
+
+CATALOG = current_catalog()
+INDUSTRIES = CATALOG.industries
+COMPANY_SIZES = CATALOG.company_sizes
+
+SERVER_PATH = os.path.join(ROOT, "serve.py")
+STREAM_PATH = "/_stcore/stream"
+# Readiness de serve.py: 200 recién cuando terminó el calentamiento
+READY_PATH = "/readyz"
+
+FINISHED_SUCCESSFULLY = ForwardMsg.ScriptFinishedStatus.Value("FINISHED_SUCCESSFULLY")
+FINISHED_EARLY_FOR_RERUN = ForwardMsg.ScriptFinishedStatus.Value("FINISHED_EARLY_FOR_RERUN")
+FINISHED_FRAGMENT_RUN_SUCCESSFULLY = ForwardMsg.ScriptFinishedStatus.Value("FINISHED_FRAGMENT_RUN_SUCCESSFULLY")
+
+PERCENTILES = (50, 95, 99)
+
+class RerunError(Exception):
+    pass
+
+# ============ SERVIDOR ============
+
+class LocalServer:
+    """`streamlit run serve.py` en un subproceso, sin navegador ni file watcher.
+
+    Los assessments, benchmarks y sesiones descargadas del servidor van a un
+    directorio temporal: las sesiones sintéticas no cuentan como assessments reales.
+    """
+    def __init__(self, port: int):
+        self.port = port
+        self.process: Optional[subprocess.Popen] = None
+        self.scratch_dir: Optional[str] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 60.0):
+        self.scratch_dir = tempfile.mkdtemp(prefix="nist-load-")
+        env = {
+            **os.environ,
+            "NIST_ASSESSMENT_DB": os.path.join(self.scratch_dir, "assessments.db"),
+            "NIST_BENCHMARK_PATH": os.path.join(self.scratch_dir, "industry_benchmarks.npz"),
+            "NIST_SESSION_DB": os.path.join(self.scratch_dir, "sessions.db")
+        }
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", SERVER_PATH,
+             "--server.headless", "true",
+             "--server.port", str(self.port),
+             "--server.fileWatcherType", "none",
+             "--browser.gatherUsageStats", "false"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise SystemExit(f"El servidor terminó con código {self.process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{READY_PATH}", timeout=1) as response:
+                    if response.status == 200:
+                        return
+            except OSError:
+                time.sleep(0.25)
+        self.stop()
+        raise SystemExit("El servidor no quedó listo (readiness)")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.scratch_dir is not None:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+            self.scratch_dir = None
+
+class ProcSampler:
+    """CPU y RSS de un proceso leídos de /proc (solo Linux)"""
+    def __init__(self, pid: Optional[int], interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.ticks_per_second = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self.peak_rss = 0
+        self._task = None
+        self._start = None
+
+    def available(self) -> bool:
+        return self.pid is not None and os.path.exists(f"/proc/{self.pid}/stat")
+
+    def cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as handle:
+            # El nombre del proceso puede tener espacios: los campos se cuentan desde el último ')'
+            fields = handle.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.ticks_per_second
+
+    def rss_bytes(self) -> int:
+        with open(f"/proc/{self.pid}/status") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    async def _poll(self):
+        while True:
+            self.peak_rss = max(self.peak_rss, self.rss_bytes())
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if not self.available():
+            return
+        self.peak_rss = self.rss_bytes()
+        self._start = (time.monotonic(), self.cpu_seconds())
+        self._task = asyncio.get_running_loop().create_task(self._poll())
+
+    def stop(self) -> Dict:
+        if self._task is None:
+            return {"cpu_percent": None, "peak_rss_mb": None, "rss_mb": None}
+        self._task.cancel()
+        started, cpu_started = self._start
+        elapsed = max(time.monotonic() - started, 1e-9)
+        rss = self.rss_bytes()
+        self.peak_rss = max(self.peak_rss, rss)
+        self._task = None
+        return {
+            "cpu_percent": round((self.cpu_seconds() - cpu_started) / elapsed * 100, 1),
+            "peak_rss_mb": round(self.peak_rss / 2**20, 1),
+            "rss_mb": round(rss / 2**20, 1)
+        }
+
+# ============ SESIÓN ============
+
+class SessionClient:
+    """Una pestaña del navegador: mantiene el estado de los widgets y mide cada rerun"""
+    def __init__(self, url: str, timeout: float):
+        self.url = url.rstrip("/") + STREAM_PATH
+        self.timeout = timeout
+        self.ws = None
+        # Widgets del último run: clave (sufijo del id) y etiqueta → id, checkboxes → valor,
+        # componentes → último estado JSON enviado
+        self.ids_by_key: Dict[str, str] = {}
+        self.ids_by_label: Dict[str, str] = {}
+        self.bool_values: Dict[str, bool] = {}
+        self.json_values: Dict[str, str] = {}
+        # Selección que muestra la grilla del paso 3 en el navegador
+        self.grid_masks = (0, 0)
+        # Fragmento que contiene cada widget: el navegador lo envía para rerunear solo ese fragmento
+        self.fragment_of: Dict[str, str] = {}
+        self.samples: List[Dict] = []
+        self.exceptions = 0
+
+    async def __aenter__(self):
+        self.ws = await connect(self.url, subprotocols=["streamlit"], max_size=None, open_timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+        self._forget_widgets()
+
+    def _forget_widgets(self):
+        self.ids_by_key.clear()
+        self.ids_by_label.clear()
+        self.bool_values.clear()
+        self.json_values.clear()
+        self.fragment_of.clear()
+
+    def _widget_id(self, key: str = None, label_prefix: str = None) -> str:
+        if key is not None:
+            if key not in self.ids_by_key:
+                raise RerunError(f"Widget no renderizado: {key}")
+            return self.ids_by_key[key]
+        for label, widget_id in self.ids_by_label.items():
+            if label.startswith(label_prefix):
+                return widget_id
+        raise RerunError(f"Botón no renderizado: {label_prefix}")
+
+    def _rerun_message(self, trigger_id: str = None, fragment_id: str = "") -> bytes:
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.query_string = ""
+        client_state.page_script_hash = ""
+        client_state.fragment_id = fragment_id
+        for widget_id, value in self.bool_values.items():
+            state = client_state.widget_states.widgets.add()
+            state.id = widget_id
+            state.bool_value = value
+        for widget_id, value in self.json_values.items():
+            state = client_state.widget_states.widgets.add()
+            state.id = widget_id
+            state.json_value = value
+        if trigger_id is not None:
+            state = client_state.widget_states.widgets.add()
+            state.id = trigger_id
+            state.trigger_value = True
+        return message.SerializeToString()
+
+    def _register(self, element, fragment_id: str):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.exceptions += 1
+            return
+        if kind not in ("button", "checkbox", "bidi_component"):
+            return
+        widget = getattr(element, kind)
+        # Formato del id: "$$ID-<hash>-<key>"; la clave puede contener guiones
+        key = widget.id.split("-", 2)[-1]
+        if key != "None":
+            self.ids_by_key[key] = widget.id
+        self.fragment_of[widget.id] = fragment_id
+        if kind == "bidi_component":
+            if key == GRID_KEY:
+                data = json.loads(widget.json)
+                self.grid_masks = (int(data["products"], 16), int(data["third_party"], 16))
+            return
+        self.ids_by_label[widget.label] = widget.id
+        if kind == "checkbox":
+            self.bool_values[widget.id] = widget.value if widget.set_value else widget.default
+
+    async def _receive_run(self, deadline: float) -> Dict:
+        """Lee hasta el fin del run (los runs cortados por un rerun encadenado no cuentan)"""
+        elements = 0
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise RerunError("Timeout esperando script_finished")
+            try:
+                raw = await asyncio.wait_for(self.ws.recv(), remaining)
+            except asyncio.TimeoutError:
+                raise RerunError("Timeout esperando script_finished")
+
+            message = ForwardMsg()
+            message.ParseFromString(raw)
+            kind = message.WhichOneof("type")
+            if kind == "new_session":
+                elements = 0
+                # Un run de fragmentos solo reemplaza sus propios widgets
+                if not message.new_session.fragment_ids_this_run:
+                    self._forget_widgets()
+            elif kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                elements += 1
+                self._register(message.delta.new_element, message.delta.fragment_id)
+            elif kind == "script_finished" and message.script_finished != FINISHED_EARLY_FOR_RERUN:
+                if message.script_finished not in (FINISHED_SUCCESSFULLY, FINISHED_FRAGMENT_RUN_SUCCESSFULLY):
+                    raise RerunError(f"Run terminado con estado {message.script_finished}")
+                return {"elements": elements, "finished_at": time.perf_counter()}
+
+    async def rerun(self, phase: str, trigger_id: str = None):
+        sent_at = time.perf_counter()
+        await self.ws.send(self._rerun_message(trigger_id, self.fragment_of.get(trigger_id, "")))
+        run = await self._receive_run(sent_at + self.timeout)
+        self.samples.append({"phase": phase, "ms": (run["finished_at"] - sent_at) * 1000,
+                             "elements": run["elements"]})
+
+    async def click(self, phase: str, key: str = None, label_prefix: str = None):
+        await self.rerun(phase, self._widget_id(key, label_prefix))
+
+    async def toggle_burst(self, phase: str, product_indexes: List[int], gap: float):
+        """Ráfaga de clics en la grilla: se marcan en el navegador y la selección viaja en un solo rerun"""
+        grid_id = self._widget_id(GRID_KEY)
+        product_mask, third_party_mask = self.grid_masks
+        for i, index in enumerate(product_indexes):
+            if i:
+                await asyncio.sleep(gap)
+            product_mask ^= 1 << index
+        self.grid_masks = (product_mask, third_party_mask)
+        self.json_values[grid_id] = json.dumps({"selection": encode_selection(product_mask, third_party_mask)})
+        sent_at = time.perf_counter()
+        await self.ws.send(self._rerun_message(fragment_id=self.fragment_of.get(grid_id, "")))
+        run = await self._receive_run(sent_at + self.timeout)
+        self.samples.append({"phase": phase, "ms": (run["finished_at"] - sent_at) * 1000,
+                             "elements": run["elements"], "burst": len(product_indexes)})
+
+# ============ RECORRIDO ============
+
+async def wizard_path(client: SessionClient, rng: random.Random, args):
+    await client.rerun("industry")
+    await client.click("industry", key=f"prof_industry_{rng.choice(list(INDUSTRIES))}")
+    await client.click("company_size", label_prefix="📍 Continuar")
+    await client.click("company_size", key=f"prof_size_{rng.choice(list(COMPANY_SIZES))}")
+    await client.click("assessment", label_prefix="🔧 Assessment")
+
+    products = rng.sample(range(CATALOG.n_products), min(args.toggles, CATALOG.n_products))
+    for start in range(0, len(products), args.burst):
+        await asyncio.sleep(rng.uniform(0, args.think_time))
+        await client.toggle_burst("assessment", products[start:start + args.burst], args.burst_gap_ms / 1000)
+
+    await client.click("results", label_prefix="📊 Generar Roadmap")
+    await asyncio.sleep(rng.uniform(0, args.think_time))
+    await client.rerun("results")
+
+async def run_session(index: int, args, outcome: Dict):
+    rng = random.Random(args.seed * 100003 + index)
+    await asyncio.sleep(args.ramp_seconds * index / max(args.current_level, 1))
+    client = SessionClient(args.url, args.timeout)
+    try:
+        for _ in range(args.iterations):
+            # Cada iteración es una pestaña nueva: sesión de Streamlit desde cero
+            async with client:
+                await wizard_path(client, rng, args)
+    except Exception as exc:  # RerunError, timeouts y conexiones cerradas por el servidor bajo carga
+        outcome["errors"].append(f"{type(exc).__name__}: {exc}")
+    finally:
+        outcome["samples"].extend(client.samples)
+        outcome["exceptions"] += client.exceptions
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+async def run_level(level: int, args, sampler: ProcSampler) -> Dict:
+    args.current_level = level
+    outcome = {"samples": [], "errors": [], "exceptions": 0}
+    sampler.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(run_session(i, args, outcome) for i in range(level)))
+    elapsed = time.perf_counter() - started
+    process = sampler.stop()
+
+    phases = {}
+    for phase in ("industry", "company_size", "assessment", "results"):
+        times = [sample["ms"] for sample in outcome["samples"] if sample["phase"] == phase]
+        phases[phase] = {f"p{pct}_ms": round(percentile(times, pct), 1) for pct in PERCENTILES}
+        phases[phase]["reruns"] = len(times)
+
+    reruns = len(outcome["samples"])
+    return {
+        "sessions": level,
+        "duration_s": round(elapsed, 2),
+        "reruns": reruns,
+        "reruns_per_s": round(reruns / elapsed, 1),
+        "failed_sessions": len(outcome["errors"]),
+        "error_rate": round(len(outcome["errors"]) / level, 4),
+        "script_exceptions": outcome["exceptions"],
+        "errors": sorted(set(outcome["errors"]))[:10],
+        "phases": phases,
+        "server": process
+    }
+
+def print_level(report: Dict):
+    results = report["phases"]["results"]
+    assessment = report["phases"]["assessment"]
+    server = report["server"]
+    print(f"{report['sessions']:>8} {report['reruns']:>7} {report['reruns_per_s']:>8} "
+          f"{assessment['p50_ms']:>9} {assessment['p95_ms']:>9} "
+          f"{results['p50_ms']:>9} {results['p95_ms']:>9} {results['p99_ms']:>9} "
+          f"{report['error_rate'] * 100:>7.1f}% {server['cpu_percent'] if server['cpu_percent'] is not None else '-':>7} "
+          f"{server['peak_rss_mb'] if server['peak_rss_mb'] is not None else '-':>8}", flush=True)
+
+async def main_async(args) -> int:
+    server = None
+    pid = args.pid
+    if args.url is None:
+        server = LocalServer(args.port)
+        server.start()
+        args.url = server.url
+        pid = server.process.pid
+
+    sampler = ProcSampler(pid)
+    reports = []
+    try:
+        print(f"{'sesiones':>8} {'reruns':>7} {'rerun/s':>8} {'p3 p50':>9} {'p3 p95':>9} "
+              f"{'p4 p50':>9} {'p4 p95':>9} {'p4 p99':>9} {'errores':>8} {'CPU %':>7} {'RSS MB':>8}")
+        for level in args.levels:
+            report = await run_level(level, args, sampler)
+            reports.append(report)
+            print_level(report)
+    finally:
+        if server is not None:
+            server.stop()
+
+    breached = next((report["sessions"] for report in reports
+                     if report["phases"]["results"]["p95_ms"] > args.slo_ms or report["error_rate"] > args.max_error_rate),
+                    None)
+    if breached is None:
+        print(f"\nshow_professional_results dentro del SLO (p95 ≤ {args.slo_ms} ms) en todos los niveles")
+    else:
+        print(f"\nshow_professional_results excede el SLO (p95 > {args.slo_ms} ms o errores > "
+              f"{args.max_error_rate:.0%}) desde {breached} sesiones concurrentes")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump({"settings": {key: value for key, value in vars(args).items() if key != "current_level"},
+                       "slo_breached_at": breached, "levels": reports}, handle, ensure_ascii=False, indent=2)
+    return 0 if breached is None else 1
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Carga concurrente sobre el websocket de Streamlit")
+    parser.add_argument("--levels", type=int, nargs="+", default=[10, 50, 100, 200],
+                        help="Sesiones concurrentes por nivel")
+    parser.add_argument("--url", help="Servidor existente (ws://host:puerto); por defecto levanta uno local. "
+                        "Un servidor existente guarda las sesiones sintéticas en su propia base de assessments")
+    parser.add_argument("--pid", type=int, help="PID del servidor existente para leer CPU/RSS de /proc")
+    parser.add_argument("--port", type=int, default=8599, help="Puerto del servidor local")
+    parser.add_argument("--iterations", type=int, default=1, help="Recorridos del wizard por sesión")
+    parser.add_argument("--toggles", type=int, default=12, help="Productos marcados en el paso 3")
+    parser.add_argument("--burst", type=int, default=3, help="Clics en la grilla por ráfaga (un rerun por ráfaga)")
+    parser.add_argument("--burst-gap-ms", type=float, default=40, help="Pausa entre clics de una ráfaga")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Pausa máxima (s) entre acciones")
+    parser.add_argument("--ramp-seconds", type=float, default=5, help="Tiempo para abrir todas las sesiones del nivel")
+    parser.add_argument("--timeout", type=float, default=60, help="Timeout por rerun (s)")
+    parser.add_argument("--slo-ms", type=float, default=2000, help="SLO de p95 para el paso de resultados")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Tasa de sesiones fallidas aceptable")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla de los recorridos")
+    parser.add_argument("--json", help="Escribe el reporte completo en este archivo")
+    return parser
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main_async(build_parser().parse_args())))
@@ -0,0 +1,317 @@
+"""Micro-benchmarks sin navegador: scoring, figura del roadmap, DataFrames y HTML de cada sección.
+
+Scoring y figura se miden sobre catálogos sintéticos de distinto tamaño
+(además del catálogo real); los DataFrames y el HTML de las vistas, que leen el
+catálogo vigente, solo sobre el real. Los resultados se escriben en JSON para
+comparar corridas.
+Las vistas de Streamlit se ejecutan en modo "bare" (sin servidor): se construye
+todo el contenido de cada elemento pero no se envía a ningún navegador.
+
+Uso:
+    python benchmarks/micro.py
+    python benchmarks/micro.py --sizes 39 500 --filter figure -o bench.json
+    python benchmarks/micro.py --compare benchmarks/results/anterior.json
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Los assessments sintéticos y sus benchmarks van a un directorio temporal: no se mezclan con los reales
+SCRATCH_DIR = tempfile.mkdtemp(prefix="nist-bench-")
+atexit.register(shutil.rmtree, SCRATCH_DIR, True)
+os.environ["NIST_ASSESSMENT_DB"] = os.path.join(SCRATCH_DIR, "assessments.db")
+os.environ["NIST_BENCHMARK_PATH"] = os.path.join(SCRATCH_DIR, "industry_benchmarks.npz")
+
+import plotly
+import streamlit as st
+from streamlit import logger as streamlit_logger
+
+from catalog import NIST_FUNCTIONS, CompiledCatalog, current_catalog, load_catalog
+from assessment_store import StoredScores
+from industry_benchmarks import IndustryBenchmarks
+from narratives import build_narrative_sections, narrative_sections
+from roadmap_chart import ProductLayout, build_roadmap_figure, product_layout
+from scoring import (
+    _build_assessment_results,
+    ScoringState,
+    calculate_enhanced_maturity,
+    get_maturity_level,
+    score_assessment,
+    score_selection_matrix,
+)
+
+DEFAULT_SIZES = [39, 500, 5000]
+BATCH_ROWS = 10000
+SYNTHETIC_SEED = 7
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+BENCH_INDUSTRY = "Servicios Financieros"
+BENCH_COMPANY_SIZE = "Mediana (51-500 empleados)"
+
+CATALOG = current_catalog()
+
+# ============ CATÁLOGOS SINTÉTICOS ============
+
+def synthetic_portfolio(n_products: int, seed: int = SYNTHETIC_SEED) -> Dict:
+    """Portfolio con las categorías reales y `n_products` productos repartidos entre ellas"""
+    rng = np.random.default_rng(seed)
+    categories = list(CATALOG.portfolio)
+    portfolio = {
+        name: {key: value for key, value in data.items() if key != "products"}
+        for name, data in CATALOG.portfolio.items()
+    }
+    for name in portfolio:
+        portfolio[name]["products"] = {}
+
+    for i in range(n_products):
+        category = categories[i % len(categories)]
+        portfolio[category]["products"][f"FortiSynthetic {i:05d}"] = {
+            "description": f"Producto sintético {i} para benchmarks del catálogo",
+            "nist_function": NIST_FUNCTIONS[int(rng.integers(len(NIST_FUNCTIONS)))],
+            "impact": int(rng.integers(1, 6)),
+            "maturity_level": int(rng.integers(1, 6)),
+            "implementation_phase": int(rng.integers(1, 6))
+        }
+    return portfolio
+
+def synthetic_catalog(n_products: int) -> CompiledCatalog:
+    return CompiledCatalog(synthetic_portfolio(n_products), dict(CATALOG.phases))
+
+def selection_masks(catalog: CompiledCatalog, seed: int = SYNTHETIC_SEED):
+    """Selección representativa: ~45% de los productos y la mitad de las categorías con terceros"""
+    rng = np.random.default_rng(seed)
+    products = rng.random(catalog.n_products) < 0.45
+    third_party = np.arange(catalog.n_categories) % 2 == 0
+    product_mask = sum(1 << i for i in np.flatnonzero(products).tolist())
+    third_party_mask = sum(1 << i for i in np.flatnonzero(third_party).tolist())
+    return products, third_party, product_mask, third_party_mask
+
+# ============ MEDICIÓN ============
+
+def measure(func: Callable[[], object], repeat: int, min_time: float) -> Dict:
+    """Tiempo por llamada en µs: se calibra el número de llamadas por repetición como timeit"""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    runs = [elapsed / number] + [timer.timeit(number) / number for _ in range(repeat - 1)]
+    runs_us = [run * 1e6 for run in runs]
+    return {
+        "calls_per_run": number,
+        "runs": repeat,
+        "min_us": round(min(runs_us), 3),
+        "median_us": round(statistics.median(runs_us), 3),
+        "mean_us": round(statistics.fmean(runs_us), 3),
+        "stdev_us": round(statistics.stdev(runs_us), 3) if repeat > 1 else 0.0
+    }
+
+class Suite:
+    def __init__(self, repeat: int, min_time: float, pattern: Optional[str]):
+        self.repeat = repeat
+        self.min_time = min_time
+        self.pattern = pattern
+        self.results: List[Dict] = []
+
+    def bench(self, name: str, catalog_label: str, func: Callable[[], object], **extra):
+        if self.pattern and self.pattern not in name:
+            return
+        result = {"name": name, "catalog": catalog_label}
+        result.update(measure(func, self.repeat, self.min_time))
+        result.update(extra)
+        self.results.append(result)
+        print(f"{name:<42} {catalog_label:>8} {result['median_us']:>14,.1f} µs", file=sys.stderr, flush=True)
+
+# ============ CASOS ============
+
+def bench_scalar_scoring(suite: Suite):
+    """Rutas por assessment del catálogo real, tal como las usa la aplicación"""
+    products = [product.key for product in CATALOG.products[::2]]
+    categories = CATALOG.categories[1::3]
+    scores = np.linspace(0, 100, 101).tolist()
+
+    suite.bench("scoring.get_maturity_level", "real", lambda: [get_maturity_level(score) for score in scores],
+                calls=len(scores))
+    suite.bench("scoring.calculate_enhanced_maturity", "real",
+                lambda: calculate_enhanced_maturity(products, categories))
+
+def bench_catalog_load(suite: Suite):
+    """Lectura, validación y compilación de data/catalog.json contra la lectura del catálogo vigente"""
+    suite.bench("catalog.load", "real", load_catalog)
+    suite.bench("catalog.current", "real", current_catalog)
+
+def bench_peer_ranking(suite: Suite, rows: int = 100000):
+    """Benchmark y percentil de un segmento con `rows` assessments, sin disco ni SQLite"""
+    rng = np.random.default_rng(SYNTHETIC_SEED)
+    scores = rng.uniform(0, 100, (rows, len(NIST_FUNCTIONS) + 1))
+    benchmarks = IndustryBenchmarks(path=os.devnull, min_samples=1)
+    benchmarks.apply(StoredScores(i + 1, BENCH_INDUSTRY, BENCH_COMPANY_SIZE, dict(zip(NIST_FUNCTIONS, row[:-1])),
+                                  row[-1]) for i, row in enumerate(scores.tolist()))
+    label = str(rows)
+    suite.bench("peers.benchmark", label, lambda: benchmarks.benchmark(BENCH_INDUSTRY, BENCH_COMPANY_SIZE))
+    suite.bench("peers.rank", label, lambda: benchmarks.peer_rank(BENCH_INDUSTRY, BENCH_COMPANY_SIZE, 63.0))
+    suite.bench("peers.rank_functions", label,
+                lambda: [benchmarks.peer_rank(BENCH_INDUSTRY, BENCH_COMPANY_SIZE, 41.0, function)
+                         for function in NIST_FUNCTIONS], calls=len(NIST_FUNCTIONS))
+
+def bench_narratives(suite: Suite):
+    """HTML y figura de las secciones narrativas: construcción por nivel contra el caché de proceso"""
+    levels = range(1, 6)
+    suite.bench("narratives.build", "real", lambda: [build_narrative_sections(level) for level in levels],
+                calls=len(levels))
+    suite.bench("narratives.cached", "real", lambda: [narrative_sections(level) for level in levels],
+                calls=len(levels))
+
+def bench_catalog(suite: Suite, catalog: CompiledCatalog, label: str, layout: ProductLayout, views: Dict):
+    products, third_party, product_mask, third_party_mask = selection_masks(catalog)
+    rng = np.random.default_rng(SYNTHETIC_SEED)
+    batch_products = rng.random((BATCH_ROWS, catalog.n_products)) < 0.45
+    batch_third_party = rng.random((BATCH_ROWS, catalog.n_categories)) < 0.5
+
+    suite.bench("scoring.single", label, lambda: score_assessment(products, third_party, catalog))
+    suite.bench("scoring.batch", label, lambda: score_selection_matrix(batch_products, batch_third_party, catalog),
+                rows=BATCH_ROWS)
+
+    state = ScoringState.from_masks(product_mask, third_party_mask, catalog)
+    position = catalog.n_products // 2
+
+    def toggle():
+        selected = not (state.product_mask >> position) & 1
+        state.set_product(position, selected)
+        return state.results()
+
+    suite.bench("scoring.state_toggle", label, toggle)
+
+    # Sin memoización: se mide la construcción completa de los resultados
+    build_results = _build_assessment_results.__wrapped__
+    suite.bench("results.build", label, lambda: build_results(product_mask, third_party_mask, catalog))
+    results = build_results(product_mask, third_party_mask, catalog)
+
+    suite.bench("figure.build", label, lambda: build_roadmap_figure(results, layout))
+    figure = build_roadmap_figure(results, layout)
+    suite.bench("figure.to_json", label, figure.to_json, bytes=len(figure.to_json().encode("utf-8")))
+
+    for name, view in views.items():
+        suite.bench(name, label, lambda view=view: view(results))
+
+def load_views() -> Dict[str, Callable]:
+    """Vistas de resultados de main.py; se importan en modo bare con una sesión mínima"""
+    import main
+
+    st.session_state.professional_assessment = {
+        "step": 4,
+        "industry": BENCH_INDUSTRY,
+        "company_size": BENCH_COMPANY_SIZE,
+        "product_mask": 0,
+        "third_party_mask": 0,
+        "assessment_complete": True
+    }
+    # Sin sesión los fragmentos no se ejecutan: se mide la función que envuelve st.fragment
+    views = {
+        "dataframe.coverage": main.build_coverage_dataframe,
+        "html.executive_dashboard": main.show_executive_dashboard,
+        "html.timeline_with_costs": main.show_simplified_timeline_with_costs,
+        "html.maturity_benefits": main.show_maturity_benefits,
+        "html.value_proposition": lambda results: main.show_fortinet_value_proposition.__wrapped__(),
+        "html.current_analysis": main.show_current_analysis,
+        "html.phase_roadmap": main.show_phase_roadmap,
+        "html.nist_analysis": main.show_nist_analysis,
+        "html.roadmap_statistics": main.show_roadmap_statistics,
+        "html.prioritized_actions": main.show_prioritized_actions
+    }
+    return {name: getattr(view, "__wrapped__", view) for name, view in views.items()}
+
+# ============ SALIDA ============
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "plotly": plotly.__version__,
+        "streamlit": st.__version__,
+        "catalog_version": CATALOG.version
+    }
+
+def compare(current: List[Dict], baseline_path: str):
+    """Imprime la variación de la mediana contra una corrida anterior"""
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = {(row["name"], row["catalog"]): row for row in json.load(handle)["benchmarks"]}
+    print(f"\n{'caso':<42} {'catálogo':>8} {'antes µs':>12} {'ahora µs':>12} {'cambio':>8}", file=sys.stderr)
+    for row in current:
+        before = baseline.get((row["name"], row["catalog"]))
+        if before is None:
+            continue
+        change = (row["median_us"] / before["median_us"] - 1) * 100 if before["median_us"] else 0.0
+        print(f"{row['name']:<42} {row['catalog']:>8} {before['median_us']:>12,.1f} {row['median_us']:>12,.1f} "
+              f"{change:>+7.1f}%", file=sys.stderr)
+
+def run(args) -> int:
+    suite = Suite(args.repeat, args.min_time, args.filter)
+    views = load_views()
+    # El modo bare advierte en cada llamada que no hay sesión; se silencia después de
+    # importar main.py porque la primera llamada a st.* reaplica el nivel de la configuración
+    streamlit_logger.set_log_level("error")
+
+    bench_scalar_scoring(suite)
+    bench_catalog_load(suite)
+    bench_peer_ranking(suite)
+    bench_narratives(suite)
+    bench_catalog(suite, CATALOG, "real", product_layout(CATALOG), views)
+    for size in args.sizes:
+        catalog = synthetic_catalog(size)
+        # Las vistas de main.py leen el catálogo vigente, no el sintético: solo se miden con el real
+        bench_catalog(suite, catalog, str(size), ProductLayout(catalog), {})
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("micro-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump({
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "environment": environment(),
+            "settings": {"sizes": args.sizes, "repeat": args.repeat, "min_time": args.min_time,
+                         "batch_rows": BATCH_ROWS},
+            "benchmarks": suite.results
+        }, handle, ensure_ascii=False, indent=2)
+    print(f"\nResultados en {output}", file=sys.stderr)
+
+    if args.compare:
+        compare(suite.results, args.compare)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks headless del assessment NIST")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Tamaños de catálogo sintético (productos)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por caso")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Segundos mínimos por repetición")
+    parser.add_argument("--filter", help="Solo casos cuyo nombre contiene este texto")
+    parser.add_argument("-o", "--output", help="Archivo JSON (por defecto benchmarks/results/micro-<fecha>.json)")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para comparar medianas")
+    return parser
+
+if __name__ == "__main__":
+    sys.exit(run(build_parser().parse_args()))
@@ -0,0 +1,345 @@
+"""Regresión de latencia por rerun del wizard completo con el AppTest headless de Streamlit.
+
+Cada escenario recorre main.py como lo haría un usuario (industria, tamaño,
+assessment con N productos marcados en la grilla, resultados) y registra por rerun el tiempo del
+lado del servidor, la cantidad de elementos renderizados y sus bytes. El p95 de cada paso
+del wizard se compara con los presupuestos guardados en rerun_budgets.json y la
+corrida termina con código 1 si alguno se excede.
+
+Elementos y bytes son deterministas y siempre se controlan. Los milisegundos
+dependen de la máquina: solo se controlan con --check-ms, y antes se escalan por
+la relación entre una calibración medida en esta corrida (runs del paso 1) y la
+guardada junto con los presupuestos.
+
+Uso:
+    python benchmarks/rerun_latency.py
+    python benchmarks/rerun_latency.py --scenario toggle_all_products --repeat 3
+    python benchmarks/rerun_latency.py --toggles 20 --json latencias.json
+    python benchmarks/rerun_latency.py --check-ms
+    python benchmarks/rerun_latency.py --update-budgets --headroom 0.5
+"""
+import argparse
+import atexit
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Los assessments sintéticos y sus benchmarks van a un directorio temporal: no se mezclan con los reales
+SCRATCH_DIR = tempfile.mkdtemp(prefix="nist-bench-")
+atexit.register(shutil.rmtree, SCRATCH_DIR, True)
+os.environ["NIST_ASSESSMENT_DB"] = os.path.join(SCRATCH_DIR, "assessments.db")
+os.environ["NIST_BENCHMARK_PATH"] = os.path.join(SCRATCH_DIR, "industry_benchmarks.npz")
+
+from streamlit.proto.WidgetStates_pb2 import WidgetStates
+from streamlit.testing.v1 import AppTest
+
+import narratives
+import results_cache
+import scoring
+from catalog import current_catalog
+from selection_grid import encode_selection
+
+CATALOG = current_catalog()
+INDUSTRIES = CATALOG.industries
+COMPANY_SIZES = CATALOG.company_sizes
+
+APP_PATH = os.path.join(ROOT, "main.py")
+BUDGETS_PATH = os.path.join(ROOT, "benchmarks", "rerun_budgets.json")
+RUN_TIMEOUT = 60
+# Runs del paso 1 que miden la velocidad de la máquina para escalar los presupuestos en ms
+CALIBRATION_RUNS = 7
+CALIBRATION_KEY = "calibration_ms"
+
+# Paso del wizard en el que queda la app después de cada rerun
+PHASES = {1: "industry", 2: "company_size", 3: "assessment", 4: "results"}
+
+DEFAULT_INDUSTRY = next(iter(INDUSTRIES))
+DEFAULT_COMPANY_SIZE = next(iter(COMPANY_SIZES))
+
+def count_elements(node) -> int:
+    """Elementos hoja del árbol renderizado (los bloques de layout no cuentan)"""
+    children = getattr(node, "children", None)
+    if children is None:
+        return 1
+    return sum(count_elements(child) for child in children.values())
+
+def count_bytes(node) -> int:
+    """Bytes serializados de los elementos y bloques del árbol: lo que viaja al navegador en el run"""
+    proto = getattr(node, "proto", None)
+    size = proto.ByteSize() if proto is not None else 0
+    children = getattr(node, "children", None)
+    if children is not None:
+        size += sum(count_bytes(child) for child in children.values())
+    return size
+
+def button_by_label(at: AppTest, prefix: str):
+    for button in at.button:
+        if button.label.startswith(prefix):
+            return button
+    raise LookupError(f"No hay botón que empiece con {prefix!r}")
+
+class Session:
+    """Una sesión de AppTest que registra latencia y elementos de cada rerun"""
+    def __init__(self, scenario: str):
+        self.scenario = scenario
+        self.at = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT)
+        self.samples: List[Dict] = []
+
+    def rerun(self, action: str, prepare: Callable[[AppTest], object] = None, widget_states: WidgetStates = None):
+        if prepare is not None:
+            prepare(self.at)
+        started = time.perf_counter()
+        if widget_states is None:
+            self.at.run()
+        else:
+            self.at._run(widget_states)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if self.at.exception:
+            raise RuntimeError(f"{self.scenario}/{action}: {self.at.exception[0].message}")
+        step = self.at.session_state.professional_assessment["step"]
+        self.samples.append({
+            "scenario": self.scenario,
+            "action": action,
+            "phase": PHASES[step],
+            "ms": round(elapsed_ms, 3),
+            "elements": count_elements(self.at._tree),
+            "bytes": count_bytes(self.at._tree)
+        })
+
+    def sync(self):
+        """Run completo sin registrar: después de un rerun de fragmentos el árbol de AppTest
+        solo contiene los fragmentos que se volvieron a ejecutar"""
+        self.at.run()
+
+    def jump_to(self, step: int, product_mask: int = 0, third_party_mask: int = 0):
+        """Atajo: escribe el estado del wizard sin recorrer los pasos anteriores"""
+        def prepare(at):
+            at.session_state.professional_assessment = {
+                "step": step,
+                "industry": DEFAULT_INDUSTRY,
+                "company_size": DEFAULT_COMPANY_SIZE,
+                "product_mask": product_mask,
+                "third_party_mask": third_party_mask,
+                "assessment_complete": False
+            }
+        self.rerun(f"jump_step_{step}", prepare)
+
+    def submit_selection(self, action: str, product_mask: int, third_party_mask: int = 0):
+        """Lo que envía la grilla del paso 3 tras una ráfaga de clics: la selección completa en un valor"""
+        grid = next((element for element in self.at.main if element.type == "bidi_component"), None)
+        if grid is None:
+            raise RuntimeError(f"{self.scenario}/{action}: la grilla de selección no está renderizada")
+        widget_states = self.at._tree.get_widget_states()
+        state = widget_states.widgets.add()
+        state.id = grid.proto.id
+        state.json_value = json.dumps({"selection": encode_selection(product_mask, third_party_mask)})
+        self.rerun(action, widget_states=widget_states)
+        self.sync()
+
+def toggle_product(session: Session, product_key: str, value: bool):
+    state = session.at.session_state.professional_assessment
+    bit = 1 << CATALOG.product_index[product_key]
+    product_mask = state["product_mask"] | bit if value else state["product_mask"] & ~bit
+    session.submit_selection("toggle_product", product_mask, state["third_party_mask"])
+
+# ============ ESCENARIOS ============
+
+def scenario_wizard(session: Session, toggles: int):
+    """Camino completo: industria, tamaño, N productos marcados y resultados"""
+    session.rerun("load")
+    session.rerun("select_industry", lambda at: at.button(key=f"prof_industry_{DEFAULT_INDUSTRY}").click())
+    session.rerun("continue", lambda at: button_by_label(at, "📍 Continuar").click())
+    session.rerun("select_company_size", lambda at: at.button(key=f"prof_size_{DEFAULT_COMPANY_SIZE}").click())
+    session.rerun("continue", lambda at: button_by_label(at, "🔧 Assessment").click())
+    for product_key in CATALOG.product_keys[:toggles]:
+        toggle_product(session, product_key, True)
+    session.rerun("generate_results", lambda at: button_by_label(at, "📊 Generar Roadmap").click())
+    session.rerun("results_rerun")
+
+def scenario_toggle_all_products(session: Session, toggles: int):
+    """Marca los productos del catálogo uno por uno y luego los desmarca"""
+    session.rerun("load")
+    session.jump_to(3)
+    for product_key in CATALOG.product_keys:
+        toggle_product(session, product_key, True)
+    for product_key in CATALOG.product_keys:
+        toggle_product(session, product_key, False)
+
+def scenario_grid_burst(session: Session, toggles: int):
+    """Todo el portfolio y los terceros marcados en una sola ráfaga de la grilla, y luego desmarcados"""
+    session.rerun("load")
+    session.jump_to(3)
+    session.submit_selection("select_all", (1 << CATALOG.n_products) - 1, (1 << CATALOG.n_categories) - 1)
+    session.submit_selection("clear_all", 0, 0)
+
+def scenario_full_coverage_results(session: Session, toggles: int):
+    """Salta directo a resultados con todo el portfolio y terceros en todas las categorías"""
+    session.rerun("load")
+    session.jump_to(4, (1 << CATALOG.n_products) - 1, (1 << CATALOG.n_categories) - 1)
+    session.rerun("results_rerun")
+
+SCENARIOS: Dict[str, Callable[[Session, int], None]] = {
+    "wizard": scenario_wizard,
+    "toggle_all_products": scenario_toggle_all_products,
+    "grid_burst": scenario_grid_burst,
+    "full_coverage_results": scenario_full_coverage_results
+}
+
+# ============ PRESUPUESTOS ============
+
+def p95(values: List[float]) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+def summarize(samples: List[Dict]) -> Dict[str, Dict[str, Dict]]:
+    grouped: Dict[str, Dict[str, List[Dict]]] = {}
+    for sample in samples:
+        grouped.setdefault(sample["scenario"], {}).setdefault(sample["phase"], []).append(sample)
+
+    summary = {}
+    for scenario, phases in grouped.items():
+        summary[scenario] = {}
+        for phase, phase_samples in phases.items():
+            times = [sample["ms"] for sample in phase_samples]
+            summary[scenario][phase] = {
+                "reruns": len(times),
+                "p50_ms": round(statistics.median(times), 2),
+                "p95_ms": round(p95(times), 2),
+                "max_ms": round(max(times), 2),
+                "max_elements": max(sample["elements"] for sample in phase_samples),
+                "max_bytes": max(sample["bytes"] for sample in phase_samples)
+            }
+    return summary
+
+def load_budgets(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+def check_budgets(summary: Dict, budgets: Dict, ms_scale: Optional[float] = None) -> List[str]:
+    """Elementos y bytes siempre; el p95 solo si hay escala (presupuesto guardado × máquina actual / calibración)"""
+    failures = []
+    for scenario, phases in summary.items():
+        for phase, stats in phases.items():
+            budget = budgets.get(scenario, {}).get(phase)
+            if budget is None:
+                continue
+            if ms_scale is not None and stats["p95_ms"] > round(budget["p95_ms"] * ms_scale, 1):
+                failures.append(f"{scenario}/{phase}: p95 {stats['p95_ms']} ms > "
+                                f"{round(budget['p95_ms'] * ms_scale, 1)} ms ({budget['p95_ms']} × {ms_scale:.2f})")
+            if stats["max_elements"] > budget.get("max_elements", float("inf")):
+                failures.append(f"{scenario}/{phase}: {stats['max_elements']} elementos > {budget['max_elements']}")
+            if stats["max_bytes"] > budget.get("max_bytes", float("inf")):
+                failures.append(f"{scenario}/{phase}: {stats['max_bytes']} bytes > {budget['max_bytes']}")
+    return failures
+
+def updated_budgets(summary: Dict, budgets: Dict, headroom: float, calibration_ms: float) -> Dict:
+    budgets[CALIBRATION_KEY] = calibration_ms
+    for scenario, phases in summary.items():
+        for phase, stats in phases.items():
+            budgets.setdefault(scenario, {})[phase] = {
+                "p95_ms": round(stats["p95_ms"] * (1 + headroom), 1),
+                "max_elements": stats["max_elements"],
+                "max_bytes": stats["max_bytes"]
+            }
+    return budgets
+
+def print_summary(summary: Dict, budgets: Dict, ms_scale: float = 1.0):
+    print(f"{'escenario':<24} {'paso':<14} {'reruns':>6} {'p50 ms':>9} {'p95 ms':>9} {'máx ms':>9} "
+          f"{'elem.':>6} {'bytes':>8} {'presup.':>9}")
+    for scenario, phases in summary.items():
+        for phase, stats in phases.items():
+            budget = budgets.get(scenario, {}).get(phase, {}).get("p95_ms")
+            budget = round(budget * ms_scale, 1) if budget is not None else "-"
+            print(f"{scenario:<24} {phase:<14} {stats['reruns']:>6} {stats['p50_ms']:>9} {stats['p95_ms']:>9} "
+                  f"{stats['max_ms']:>9} {stats['max_elements']:>6} {stats['max_bytes']:>8} {budget:>9}")
+
+def warm_up():
+    """Runs descartados hasta el paso 4: los imports del primer script y los diferidos de la
+    página de resultados (pandas, Plotly) no cuentan como latencia de rerun"""
+    session = Session("warm_up")
+    session.rerun("load")
+    session.jump_to(4)
+
+def calibrate() -> float:
+    """Mediana en ms de un run del paso 1 en esta máquina, con los imports ya calientes"""
+    session = Session("calibration")
+    for _ in range(CALIBRATION_RUNS):
+        session.rerun("load")
+    return round(statistics.median(sample["ms"] for sample in session.samples), 2)
+
+def run(args) -> int:
+    warm_up()
+    calibration_ms = calibrate()
+    samples: List[Dict] = []
+    for name in args.scenario or list(SCENARIOS):
+        for _ in range(args.repeat):
+            # Cachés de proceso vacías: cada repetición mide el mismo punto de partida
+            results_cache.RESULTS_CACHE.clear()
+            narratives.NARRATIVE_CACHE.clear()
+            scoring._build_assessment_results.cache_clear()
+            session = Session(name)
+            SCENARIOS[name](session, args.toggles)
+            samples.extend(session.samples)
+
+    summary = summarize(samples)
+    budgets = load_budgets(args.budgets)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump({"summary": summary, "samples": samples}, handle, ensure_ascii=False, indent=2)
+
+    if args.update_budgets:
+        budgets = updated_budgets(summary, budgets, args.headroom, calibration_ms)
+        with open(args.budgets, "w", encoding="utf-8") as handle:
+            json.dump(budgets, handle, ensure_ascii=False, indent=2)
+            handle.write("\n")
+        print_summary(summary, budgets)
+        print(f"\nPresupuestos actualizados en {args.budgets}")
+        return 0
+
+    ms_scale = None
+    if args.check_ms:
+        reference_ms = budgets.get(CALIBRATION_KEY)
+        if not reference_ms:
+            print(f"{args.budgets} no tiene calibración: corra --update-budgets antes de usar --check-ms")
+            return 2
+        ms_scale = calibration_ms / reference_ms
+        print(f"Calibración: {calibration_ms} ms en esta máquina, {reference_ms} ms al guardar los presupuestos "
+              f"(escala {ms_scale:.2f})\n")
+    print_summary(summary, budgets, ms_scale or 1.0)
+    failures = check_budgets(summary, budgets, ms_scale)
+    if failures:
+        print("\nPresupuestos excedidos:")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        return 1
+    print("\nTodos los pasos dentro de presupuesto")
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Latencia por rerun del wizard (AppTest headless)")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="Escenario a correr (repetible; por defecto todos)")
+    parser.add_argument("--repeat", type=int, default=1, help="Repeticiones de cada escenario")
+    parser.add_argument("--toggles", type=int, default=10, help="Checkboxes a marcar en el escenario wizard")
+    parser.add_argument("--budgets", default=BUDGETS_PATH, help="Archivo JSON de presupuestos")
+    parser.add_argument("--check-ms", action="store_true",
+                        help="Controla también el p95 en ms, escalado por la calibración de esta máquina")
+    parser.add_argument("--update-budgets", action="store_true",
+                        help="Reescribe los presupuestos con el p95 medido más el margen")
+    parser.add_argument("--headroom", type=float, default=1.0, help="Margen sobre el p95 al actualizar (1.0 = +100%%)")
+    parser.add_argument("--json", help="Escribe también las muestras por rerun en este archivo")
+    return parser
+
+if __name__ == "__main__":
+    sys.exit(run(build_parser().parse_args()))
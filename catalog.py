@@ -0,0 +1,365 @@
+"""Catálogo Fortinet Security Fabric: archivo de datos versionado y su versión compilada en arreglos NumPy.
+
+Portfolio, fases de implementación, industrias y tamaños de empresa viven en
+data/catalog.json (o en el archivo de NIST_CATALOG_PATH). `current_catalog()`
+lo lee, valida y compila una vez por versión de contenido; como mucho cada
+NIST_CATALOG_CHECK_SECONDS revisa si el archivo cambió y, si cambió su
+contenido, compila la versión nueva y la publica con un solo reemplazo de
+referencia, sin reiniciar el proceso. Los cachés que dependen del catálogo se
+registran con `on_catalog_change` y solo esos se invalidan.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+CATALOG_PATH = os.environ.get("NIST_CATALOG_PATH",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalog.json"))
+CATALOG_CHECK_SECONDS = float(os.environ.get("NIST_CATALOG_CHECK_SECONDS", "5"))
+CATALOG_SCHEMA_VERSION = 1
+# Versiones anteriores que se conservan para traducir selecciones de sesiones abiertas
+CATALOG_HISTORY = 4
+
+# Funciones NIST en orden fijo: definen las columnas de los arreglos compilados
+NIST_FUNCTION_WEIGHTS = {
+    "Identify": 0.15,
+    "Protect": 0.35,
+    "Detect": 0.25,
+    "Respond": 0.15,
+    "Recover": 0.10
+}
+NIST_FUNCTIONS: List[str] = list(NIST_FUNCTION_WEIGHTS.keys())
+
+def catalog_version(*tables) -> str:
+    """Hash de contenido del catálogo: cambia con cualquier edición de los datos"""
+    payload = json.dumps(tables, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+class CatalogProduct(NamedTuple):
+    index: int
+    key: str
+    name: str
+    category: str
+    description: str
+    nist_function: str
+    impact: int
+    maturity_level: int
+    implementation_phase: int
+
+def _freeze_index(index: Dict) -> Mapping:
+    return MappingProxyType({name: tuple(products) for name, products in index.items()})
+
+class CompiledCatalog:
+    """Portfolio aplanado en arreglos NumPy e índices inmutables: una fila por producto, en orden de catálogo"""
+    def __init__(self, portfolio: Dict, phases: Dict = None, industries: Dict = None, company_sizes: Dict = None,
+                 release: str = None):
+        self.version = catalog_version(portfolio, phases, industries, company_sizes)
+        self.release = release
+        # Tablas de origen, para las vistas que muestran textos del catálogo
+        self.portfolio: Mapping[str, Dict] = MappingProxyType(portfolio)
+        self.phases: Mapping[int, Dict] = MappingProxyType(phases or {})
+        self.industries: Mapping[str, Dict] = MappingProxyType(industries or {})
+        self.company_sizes: Mapping[str, Dict] = MappingProxyType(company_sizes or {})
+        self.categories: List[str] = list(portfolio.keys())
+        self.products: Tuple[CatalogProduct, ...] = tuple(
+            CatalogProduct(
+                index=0,
+                key=f"{category_name}_{product_name}",
+                name=product_name,
+                category=category_name,
+                description=product_info["description"],
+                nist_function=product_info["nist_function"],
+                impact=product_info["impact"],
+                maturity_level=product_info["maturity_level"],
+                implementation_phase=product_info["implementation_phase"]
+            )
+            for category_name, category_data in portfolio.items()
+            for product_name, product_info in category_data["products"].items()
+        )
+        self.products = tuple(product._replace(index=i) for i, product in enumerate(self.products))
+        self.product_keys: List[str] = [product.key for product in self.products]
+        self.product_names: List[str] = [product.name for product in self.products]
+        
+        self.n_products = len(self.products)
+        self.n_categories = len(self.categories)
+        self.n_functions = len(NIST_FUNCTIONS)
+        
+        # Posición de bit de cada producto/categoría en las máscaras de selección
+        self.product_index: Dict[str, int] = {key: i for i, key in enumerate(self.product_keys)}
+        self.category_position: Dict[str, int] = {name: i for i, name in enumerate(self.categories)}
+        self.category_masks: List[int] = [0] * self.n_categories
+        for product in self.products:
+            self.category_masks[self.category_position[product.category]] |= 1 << product.index
+        
+        self._build_indexes(phases or {}, industries or {}, company_sizes or {})
+        self._build_arrays()
+    
+    def _build_indexes(self, phases: Dict, industries: Dict, company_sizes: Dict):
+        by_phase = {phase: [] for phase in phases}
+        by_function = {function: [] for function in NIST_FUNCTIONS}
+        by_category = {category: [] for category in self.categories}
+        for product in self.products:
+            by_phase.setdefault(product.implementation_phase, []).append(product)
+            by_function[product.nist_function].append(product)
+            by_category[product.category].append(product)
+        for products in by_phase.values():
+            products.sort(key=lambda product: product.impact, reverse=True)
+        
+        self.products_by_phase: Mapping[int, Tuple[CatalogProduct, ...]] = _freeze_index(by_phase)
+        self.products_by_function: Mapping[str, Tuple[CatalogProduct, ...]] = _freeze_index(by_function)
+        self.products_by_category: Mapping[str, Tuple[CatalogProduct, ...]] = _freeze_index(by_category)
+        
+        # Alias: clave de catálogo, nombre completo y nombre corto ("FortiGate" → "FortiGate NGFW")
+        lookup = {}
+        for product in self.products:
+            lookup[product.key] = product.index
+            lookup[product.name] = product.index
+        short_names = {}
+        for product in self.products:
+            short_name = product.name.split()[0]
+            if short_name != product.name:
+                short_names.setdefault(short_name, []).append(product.index)
+        for short_name, indexes in short_names.items():
+            if short_name not in lookup and len(indexes) == 1:
+                lookup[short_name] = indexes[0]
+        self.product_lookup: Mapping[str, int] = MappingProxyType(lookup)
+        
+        self.critical_products_by_industry: Mapping[str, Tuple[CatalogProduct, ...]] = _freeze_index({
+            industry: [self.resolve_product(name) for name in industry_data["critical_products"]]
+            for industry, industry_data in industries.items()
+        })
+        self.focus_products_by_size: Mapping[str, Tuple[CatalogProduct, ...]] = _freeze_index({
+            size: [self.resolve_product(name) for name in size_data["focus"]]
+            for size, size_data in company_sizes.items()
+        })
+    
+    def resolve_product(self, name: str) -> CatalogProduct:
+        """Producto por clave de catálogo, nombre o alias corto"""
+        if name not in self.product_lookup:
+            raise ValueError(f"Producto desconocido: {name}")
+        return self.products[self.product_lookup[name]]
+    
+    def _build_arrays(self):
+        self.impact = np.array([product.impact for product in self.products], dtype=np.int64)
+        self.maturity_level = np.array([product.maturity_level for product in self.products], dtype=np.int64)
+        self.weighted_impact = self.impact * (self.maturity_level / 5.0)
+        self.function_index = np.array([NIST_FUNCTIONS.index(product.nist_function) for product in self.products],
+                                       dtype=np.intp)
+        self.category_index = np.array([self.category_position[product.category] for product in self.products],
+                                       dtype=np.intp)
+        self.phase = np.array([product.implementation_phase for product in self.products], dtype=np.int64)
+        
+        rows = np.arange(self.n_products)
+        
+        # producto → impacto ponderado en su función NIST (P × F)
+        self.function_matrix = np.zeros((self.n_products, self.n_functions))
+        self.function_matrix[rows, self.function_index] = self.weighted_impact
+        
+        # producto → categoría (P × C)
+        self.category_matrix = np.zeros((self.n_products, self.n_categories))
+        self.category_matrix[rows, self.category_index] = 1.0
+        
+        # impacto ponderado de cada categoría repartido por función (C × F)
+        self.category_function_impact = self.category_matrix.T @ self.function_matrix
+        self.function_totals = self.function_matrix.sum(axis=0)
+        # Funciones con algún producto: las demás puntúan 0 para todos y no se comparan ni se priorizan
+        self.scored_functions = tuple(function for function, total in zip(NIST_FUNCTIONS, self.function_totals)
+                                      if total > 0)
+        
+        # Mismos pesos en enteros (impacto × nivel de madurez) para acumuladores exactos
+        self.impact_units = self.impact * self.maturity_level
+        self.category_function_units = np.rint(self.category_function_impact * 5).astype(np.int64)
+        self.function_total_units = np.rint(self.function_totals * 5).astype(np.int64)
+        self.function_weights = np.array([NIST_FUNCTION_WEIGHTS[f] for f in NIST_FUNCTIONS])
+        
+        for array in (self.impact, self.maturity_level, self.weighted_impact, self.impact_units,
+                      self.category_function_units, self.function_total_units, self.function_index, self.category_index,
+                      self.phase, self.function_matrix, self.category_matrix,
+                      self.category_function_impact, self.function_totals, self.function_weights):
+            array.setflags(write=False)
+
+# ============ ARCHIVO DE DATOS ============
+
+PRODUCT_FIELDS = {"description": str, "nist_function": str, "impact": int, "maturity_level": int,
+                  "implementation_phase": int}
+CATEGORY_FIELDS = {"icon": str, "color": str, "description": str, "products": dict}
+PHASE_FIELDS = {"name": str, "description": str, "color": str, "focus": str, "timeline": str}
+INDUSTRY_FIELDS = {"icon": str, "benchmark": (int, float), "priorities": list, "regulations": list,
+                   "critical_products": list, "next_steps": str}
+COMPANY_SIZE_FIELDS = {"icon": str, "priority": str, "timeline": str, "focus": list, "next_steps": str}
+
+class CatalogData(NamedTuple):
+    release: str
+    portfolio: Dict
+    phases: Dict[int, Dict]
+    industries: Dict
+    company_sizes: Dict
+
+def _check_fields(where: str, entry, fields: Dict):
+    if not isinstance(entry, dict):
+        raise ValueError(f"{where}: se esperaba un objeto")
+    for field, expected in fields.items():
+        if field not in entry:
+            raise ValueError(f"{where}: falta el campo '{field}'")
+        if not isinstance(entry[field], expected) or isinstance(entry[field], bool):
+            raise ValueError(f"{where}: tipo inválido en '{field}'")
+
+def parse_catalog_data(raw: bytes) -> CatalogData:
+    """Valida el contenido del archivo de catálogo; cualquier error se informa como ValueError"""
+    try:
+        data = json.loads(raw)
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Catálogo ilegible: {exc}") from exc
+    if not isinstance(data, dict):
+        raise ValueError("Catálogo: se esperaba un objeto")
+    if data.get("schema_version") != CATALOG_SCHEMA_VERSION:
+        raise ValueError(f"Versión de esquema no soportada: {data.get('schema_version')}")
+    
+    portfolio = data.get("portfolio")
+    if not isinstance(portfolio, dict) or not portfolio:
+        raise ValueError("Catálogo sin portfolio")
+    raw_phases = data.get("implementation_phases")
+    if not isinstance(raw_phases, dict) or not raw_phases:
+        raise ValueError("Catálogo sin fases de implementación")
+    phases = {}
+    for phase, phase_data in raw_phases.items():
+        if not str(phase).isdigit():
+            raise ValueError(f"Fase inválida: {phase}")
+        _check_fields(f"Fase {phase}", phase_data, PHASE_FIELDS)
+        phases[int(phase)] = phase_data
+    phases = dict(sorted(phases.items()))
+    
+    for category_name, category_data in portfolio.items():
+        _check_fields(f"Categoría {category_name}", category_data, CATEGORY_FIELDS)
+        for product_name, product_info in category_data["products"].items():
+            where = f"Producto {category_name}/{product_name}"
+            _check_fields(where, product_info, PRODUCT_FIELDS)
+            if product_info["nist_function"] not in NIST_FUNCTION_WEIGHTS:
+                raise ValueError(f"{where}: función NIST desconocida '{product_info['nist_function']}'")
+            for field in ("impact", "maturity_level"):
+                if not 1 <= product_info[field] <= 5:
+                    raise ValueError(f"{where}: '{field}' fuera de rango 1-5")
+            if product_info["implementation_phase"] not in phases:
+                raise ValueError(f"{where}: fase {product_info['implementation_phase']} no definida")
+    
+    industries = data.get("industries") or {}
+    company_sizes = data.get("company_sizes") or {}
+    for industry, industry_data in industries.items():
+        _check_fields(f"Industria {industry}", industry_data, INDUSTRY_FIELDS)
+    for size, size_data in company_sizes.items():
+        _check_fields(f"Tamaño {size}", size_data, COMPANY_SIZE_FIELDS)
+    
+    return CatalogData(str(data.get("release") or ""), portfolio, phases, industries, company_sizes)
+
+def compile_catalog(data: CatalogData) -> CompiledCatalog:
+    # Los productos críticos y de foco se resuelven al compilar: un nombre desconocido es un ValueError
+    return CompiledCatalog(data.portfolio, data.phases, data.industries, data.company_sizes, release=data.release)
+
+def load_catalog(path: str = CATALOG_PATH) -> CompiledCatalog:
+    with open(path, "rb") as handle:
+        return compile_catalog(parse_catalog_data(handle.read()))
+
+# ============ VERSIÓN VIGENTE ============
+
+CatalogListener = Callable[[CompiledCatalog, CompiledCatalog], None]
+
+class CatalogStore:
+    """Catálogo vigente del proceso, recargado en caliente cuando cambia el contenido del archivo.
+    
+    La comprobación barata (mtime, tamaño, inodo) corre como mucho cada
+    `check_seconds`; solo si el archivo cambió se lee y se compara el hash de
+    contenido. Un archivo nuevo se compila completo antes de publicarlo, así
+    que las lecturas concurrentes ven la versión anterior o la nueva, nunca una
+    mezcla. Un archivo inválido no reemplaza a la versión vigente.
+    """
+    def __init__(self, path: str = CATALOG_PATH, check_seconds: float = CATALOG_CHECK_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._catalog: Optional[CompiledCatalog] = None
+        self._file_state = None
+        self._checked_at = 0.0
+        self._history: "OrderedDict[str, CompiledCatalog]" = OrderedDict()
+        self._listeners: List[CatalogListener] = []
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+    
+    def current(self) -> CompiledCatalog:
+        catalog = self._catalog
+        if catalog is not None and time.monotonic() - self._checked_at < self.check_seconds:
+            return catalog
+        return self.refresh()
+    
+    def refresh(self) -> CompiledCatalog:
+        """Revisa el archivo ahora; devuelve la versión vigente después de la revisión"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            previous = self._catalog
+            try:
+                stat = os.stat(self.path)
+                file_state = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+                if previous is not None and file_state == self._file_state:
+                    return previous
+                with open(self.path, "rb") as handle:
+                    data = parse_catalog_data(handle.read())
+                self._file_state = file_state
+                if previous is not None and previous.version == catalog_version(
+                        data.portfolio, data.phases, data.industries, data.company_sizes):
+                    # Archivo reescrito con el mismo contenido: nada que invalidar
+                    return previous
+                catalog = compile_catalog(data)
+            except (OSError, ValueError) as exc:
+                if previous is None:
+                    raise
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                return previous
+            
+            self._catalog = catalog
+            self.last_error = None
+            self._history[catalog.version] = catalog
+            while len(self._history) > CATALOG_HISTORY:
+                self._history.popitem(last=False)
+            if previous is not None:
+                self.reloads += 1
+            listeners = list(self._listeners)
+        
+        if previous is not None:
+            for listener in listeners:
+                listener(previous, catalog)
+        return catalog
+    
+    def by_version(self, version: str) -> Optional[CompiledCatalog]:
+        with self._lock:
+            return self._history.get(version)
+    
+    def on_change(self, listener: CatalogListener):
+        with self._lock:
+            self._listeners.append(listener)
+    
+    def stats(self) -> Dict:
+        catalog = self._catalog
+        return {
+            "version": catalog.version if catalog else None,
+            "release": catalog.release if catalog else None,
+            "reloads": self.reloads,
+            "error": self.last_error
+        }
+
+CATALOG_STORE = CatalogStore()
+
+def current_catalog() -> CompiledCatalog:
+    """Catálogo compilado vigente; se carga en la primera llamada del proceso"""
+    return CATALOG_STORE.current()
+
+def catalog_by_version(version: str) -> Optional[CompiledCatalog]:
+    """Una de las últimas versiones publicadas en este proceso, si todavía se conserva"""
+    return CATALOG_STORE.by_version(version)
+
+def on_catalog_change(listener: CatalogListener):
+    """Registra `listener(anterior, nuevo)`, llamado después de publicar una versión nueva"""
+    CATALOG_STORE.on_change(listener)
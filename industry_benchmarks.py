@@ -0,0 +1,295 @@
+"""Benchmarks por industria, tamaño y función NIST calculados en streaming sobre assessments reales.
+
+Cada segmento (industria × tamaño × métrica, más los acumulados por industria y
+global) guarda media y varianza móviles (Welford) y un histograma de puntajes de
+0,1 punto: un sketch de cuantiles exacto a esa resolución, que se combina
+sumando conteos. Cada lote que confirma assessment_store actualiza los
+segmentos del assessment en O(1); leer un benchmark es una búsqueda en un dict,
+con el resumen ya calculado. El mismo histograma, acumulado, da el percentil de
+un puntaje entre sus pares: la casilla del puntaje se calcula directamente y el
+rango es una lectura del acumulado, sin consultar el historial. Los sketches se
+guardan en NIST_BENCHMARK_PATH y al arrancar solo se leen de SQLite las filas
+posteriores a las ya incorporadas.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import zipfile
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from assessment_store import ASSESSMENT_STORE, AssessmentStore, StoredScores, iter_scores
+from catalog import NIST_FUNCTIONS
+
+BENCHMARK_PATH = os.environ.get("NIST_BENCHMARK_PATH", "industry_benchmarks.npz")
+# Assessments mínimos para publicar el benchmark de un segmento; si no alcanza se usa el de la industria
+MIN_SAMPLES = int(os.environ.get("NIST_BENCHMARK_MIN_SAMPLES", "20"))
+SAVE_SECONDS = float(os.environ.get("NIST_BENCHMARK_SAVE_SECONDS", "30"))
+
+OVERALL = "overall"
+METRICS: List[str] = NIST_FUNCTIONS + [OVERALL]
+# Comodín de los segmentos acumulados ("todas las industrias", "todos los tamaños")
+ANY = "*"
+
+# Puntajes en décimas de punto: 1001 casillas de 0,0 a 100,0
+BINS_PER_POINT = 10
+N_BINS = 100 * BINS_PER_POINT + 1
+
+SegmentKey = Tuple[str, str, str]
+
+# Versión del formato de NIST_BENCHMARK_PATH; un archivo de otra versión se descarta y se reconstruye desde SQLite
+SKETCH_FORMAT = 2
+
+class Benchmark(NamedTuple):
+    count: int
+    mean: float
+    std: float
+    p25: float
+    p50: float
+    p75: float
+    industry: str
+    company_size: str
+
+class PeerRank(NamedTuple):
+    percentile: float
+    count: int
+    industry: str
+    company_size: str
+
+class ScoreSketch:
+    """Media/varianza móviles e histograma de puntajes de un segmento; combinable con `merge`"""
+    def __init__(self, histogram: np.ndarray = None, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.histogram = histogram if histogram is not None else np.zeros(N_BINS, dtype=np.int64)
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self._cumulative: Optional[np.ndarray] = None
+
+    def add(self, score: float):
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        self.histogram[score_bin(score)] += 1
+        self._cumulative = None
+
+    def merge(self, other: "ScoreSketch"):
+        """Combina otro sketch (otra réplica, otro período) con la fórmula paralela de Chan"""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.histogram += other.histogram
+        self._cumulative = None
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0
+
+    def cumulative(self) -> np.ndarray:
+        if self._cumulative is None:
+            self._cumulative = np.cumsum(self.histogram)
+        return self._cumulative
+
+    def percentile_of(self, score: float) -> float:
+        """Porcentaje de puntajes por debajo, contando la mitad de los empatados en la misma casilla"""
+        if self.count == 0:
+            return 0.0
+        position = score_bin(score)
+        below = int(self.cumulative()[position - 1]) if position else 0
+        return 100.0 * (below + 0.5 * int(self.histogram[position])) / self.count
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        position = int(np.searchsorted(self.cumulative(), q * self.count, side="left"))
+        return min(position, N_BINS - 1) / BINS_PER_POINT
+
+def score_bin(score: float) -> int:
+    return int(round(min(max(score, 0.0), 100.0) * BINS_PER_POINT))
+
+def segment_keys(industry: Optional[str], company_size: Optional[str], metric: str) -> List[SegmentKey]:
+    """Segmentos que actualiza un assessment: el suyo, el de su industria y el global, sin repetir.
+
+    Sin tamaño el segmento propio es el de la industria, y sin industria todos son
+    el global: cada puntaje entra una sola vez en cada sketch.
+    """
+    return list(dict.fromkeys(
+        [(industry or ANY, company_size or ANY, metric), (industry or ANY, ANY, metric), (ANY, ANY, metric)]
+    ))
+
+def lookup_keys(industry: Optional[str], company_size: Optional[str], metric: str) -> List[SegmentKey]:
+    """Segmentos donde se busca un benchmark, del más específico al más amplio: el propio y el de la industria"""
+    return list(dict.fromkeys([(industry or ANY, company_size or ANY, metric), (industry or ANY, ANY, metric)]))
+
+class IndustryBenchmarks:
+    """Sketches de todos los segmentos y sus resúmenes ya calculados"""
+    def __init__(self, path: str = BENCHMARK_PATH, min_samples: int = MIN_SAMPLES):
+        self.path = path
+        self.min_samples = min_samples
+        self.sketches: Dict[SegmentKey, ScoreSketch] = {}
+        self.last_id = 0
+        self._summaries: Dict[SegmentKey, Benchmark] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._saved_at = time.monotonic()
+        self._dirty = False
+        self.load_error: Optional[str] = None
+
+    # ---- escritura (hilo escritor de assessment_store) ----
+
+    def _apply_locked(self, rows: Iterable[StoredScores]):
+        for row in rows:
+            # Filas ya incorporadas (leídas al ponerse al día) se ignoran por id
+            if row.id <= self.last_id:
+                continue
+            for metric in METRICS:
+                score = row.overall_score if metric == OVERALL else row.function_scores[metric]
+                for key in segment_keys(row.industry, row.company_size, metric):
+                    sketch = self.sketches.get(key)
+                    if sketch is None:
+                        sketch = self.sketches[key] = ScoreSketch()
+                    sketch.add(score)
+                    self._summaries.pop(key, None)
+            self.last_id = row.id
+            self._dirty = True
+
+    def apply(self, rows: Iterable[StoredScores]):
+        with self._lock:
+            self._apply_locked(rows)
+        if time.monotonic() - self._saved_at >= SAVE_SECONDS:
+            self.save()
+
+    def start(self, store: AssessmentStore):
+        """Carga los sketches guardados, se suscribe a los lotes nuevos y se pone al día con SQLite.
+        
+        La suscripción y la lectura de SQLite ocurren bajo el mismo lock: un lote
+        confirmado mientras tanto espera y, si ya se leyó, se descarta por id.
+        """
+        self.load()
+        with self._lock:
+            store.on_commit(self.apply)
+            self._apply_locked(iter_scores(store.path, self.last_id))
+        self.save()
+
+    # ---- lectura (reruns) ----
+
+    def summary(self, key: SegmentKey) -> Optional[Benchmark]:
+        summary = self._summaries.get(key)
+        if summary is not None:
+            return summary
+        with self._lock:
+            sketch = self.sketches.get(key)
+            if sketch is None or sketch.count < self.min_samples:
+                return None
+            summary = Benchmark(sketch.count, sketch.mean, sketch.std, sketch.quantile(0.25), sketch.quantile(0.5),
+                                sketch.quantile(0.75), key[0], key[1])
+            self._summaries[key] = summary
+        return summary
+
+    def benchmark(self, industry: Optional[str], company_size: Optional[str],
+                  metric: str = OVERALL) -> Optional[Benchmark]:
+        """Benchmark del segmento más específico con muestras suficientes (tamaño → industria); None si no hay"""
+        for key in lookup_keys(industry, company_size, metric):
+            summary = self.summary(key)
+            if summary is not None:
+                return summary
+        return None
+
+    def peer_rank(self, industry: Optional[str], company_size: Optional[str], score: float,
+                  metric: str = OVERALL) -> Optional[PeerRank]:
+        """Percentil del puntaje en el segmento más específico con muestras suficientes; None si no hay"""
+        for key in lookup_keys(industry, company_size, metric):
+            with self._lock:
+                sketch = self.sketches.get(key)
+                if sketch is not None and sketch.count >= self.min_samples:
+                    return PeerRank(sketch.percentile_of(score), sketch.count, key[0], key[1])
+        return None
+
+    # ---- persistencia ----
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            keys = list(self.sketches)
+            histograms = np.stack([self.sketches[key].histogram for key in keys]) if keys else np.zeros((0, N_BINS))
+            moments = np.array([[self.sketches[key].count, self.sketches[key].mean, self.sketches[key].m2]
+                                for key in keys], dtype=np.float64).reshape(-1, 3)
+            last_id = self.last_id
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        temporary = f"{self.path}.tmp.npz"
+        with self._save_lock:
+            np.savez_compressed(temporary, format=np.array(SKETCH_FORMAT), keys=np.array(json.dumps(keys, ensure_ascii=False)),
+                                histograms=histograms, moments=moments, last_id=np.array(last_id))
+            # Renombrar es atómico: un corte a mitad de escritura deja el archivo anterior intacto
+            os.replace(temporary, self.path)
+
+    def load(self):
+        """Lee los sketches guardados; un archivo de otra versión, ilegible o inconsistente se descarta.
+
+        Sin sketches cargados `last_id` queda en 0 y `start` los reconstruye con todo el historial de SQLite.
+        """
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as saved:
+                # La versión 1 contaba dos o tres veces los assessments sin tamaño o sin industria
+                if "format" not in saved.files or int(saved["format"]) != SKETCH_FORMAT:
+                    raise ValueError(f"formato distinto de {SKETCH_FORMAT}")
+                keys = [tuple(key) for key in json.loads(str(saved["keys"]))]
+                histograms = saved["histograms"].astype(np.int64)
+                moments = saved["moments"]
+                last_id = int(saved["last_id"])
+            if any(len(key) != 3 for key in keys) or histograms.shape != (len(keys), N_BINS) \
+                    or moments.shape != (len(keys), 3):
+                raise ValueError("claves, histogramas y momentos no coinciden")
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as exc:
+            self.load_error = f"{type(exc).__name__}: {exc}"
+            self._discard()
+            return
+        with self._lock:
+            self.sketches = {
+                key: ScoreSketch(histograms[i].copy(), int(moments[i, 0]), float(moments[i, 1]), float(moments[i, 2]))
+                for i, key in enumerate(keys)
+            }
+            self._summaries.clear()
+            self.last_id = last_id
+
+    def _discard(self):
+        """Borra el archivo descartado; el próximo `save` lo reescribe con los sketches reconstruidos"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        with self._lock:
+            self.sketches = {}
+            self._summaries.clear()
+            self.last_id = 0
+            self._dirty = True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"segments": len(self.sketches), "last_id": self.last_id, "load_error": self.load_error}
+
+INDUSTRY_BENCHMARKS = IndustryBenchmarks()
+_started = False
+_start_lock = threading.Lock()
+
+def industry_benchmarks() -> IndustryBenchmarks:
+    """Benchmarks del proceso; la primera llamada carga los sketches y se pone al día con SQLite"""
+    global _started
+    if not _started:
+        with _start_lock:
+            if not _started:
+                INDUSTRY_BENCHMARKS.start(ASSESSMENT_STORE)
+                atexit.register(INDUSTRY_BENCHMARKS.save)
+                _started = True
+    return INDUSTRY_BENCHMARKS
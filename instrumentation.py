@@ -0,0 +1,119 @@
+"""Instrumentación opcional por sección: tiempo de render, elementos y bytes emitidos.
+
+Se activa con `?debug=perf` en la URL (que además muestra el panel de depuración)
+o con la variable de entorno NIST_PERF=1. Cada muestra se acumula en ventanas
+móviles por sección y se agrega a un archivo JSONL local (NIST_PERF_LOG).
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+PERF_QUERY_PARAM = "debug"
+PERF_QUERY_VALUE = "perf"
+PERF_LOG_PATH = os.environ.get("NIST_PERF_LOG", "perf_samples.jsonl")
+ROLLING_WINDOW = 500
+
+class SectionStats:
+    """Ventanas móviles de muestras por sección, compartidas por todo el proceso"""
+    def __init__(self, window: int = ROLLING_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, sample: Dict):
+        with self._lock:
+            self._samples.setdefault(sample["section"], deque(maxlen=self.window)).append(sample)
+
+    def summary(self) -> List[Dict]:
+        with self._lock:
+            snapshot = {section: list(samples) for section, samples in self._samples.items()}
+
+        rows = []
+        for section, samples in snapshot.items():
+            times = sorted(sample["ms"] for sample in samples)
+            rows.append({
+                "Sección": section,
+                "Muestras": len(samples),
+                "p50 ms": round(percentile(times, 50), 2),
+                "p95 ms": round(percentile(times, 95), 2),
+                "Elementos": samples[-1]["elements"],
+                "Bytes": samples[-1]["bytes"]
+            })
+        return rows
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+SECTION_STATS = SectionStats()
+_log_lock = threading.Lock()
+
+def debug_panel_requested() -> bool:
+    return st.query_params.get(PERF_QUERY_PARAM) == PERF_QUERY_VALUE
+
+def is_enabled() -> bool:
+    return os.environ.get("NIST_PERF") == "1" or debug_panel_requested()
+
+def _append_sample(sample: Dict):
+    with _log_lock, open(PERF_LOG_PATH, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(sample, ensure_ascii=False) + "\n")
+
+@contextmanager
+def section(name: str):
+    """Mide una sección: tiempo de pared y mensajes/bytes enviados al navegador"""
+    ctx = get_script_run_ctx()
+    if ctx is None or not is_enabled():
+        yield
+        return
+
+    counters = {"elements": 0, "bytes": 0}
+    enqueue = ctx._enqueue
+
+    def counting_enqueue(msg):
+        counters["elements"] += 1
+        counters["bytes"] += msg.ByteSize()
+        enqueue(msg)
+
+    ctx._enqueue = counting_enqueue
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        ctx._enqueue = enqueue
+        sample = {
+            "ts": time.time(),
+            "session": ctx.session_id,
+            "section": name,
+            "ms": round(elapsed_ms, 3),
+            "elements": counters["elements"],
+            "bytes": counters["bytes"]
+        }
+        SECTION_STATS.add(sample)
+        _append_sample(sample)
+
+def show_perf_debug_panel(extra_stats: Dict[str, Dict] = None):
+    """Panel oculto con p50/p95 por sección; solo visible con ?debug=perf"""
+    if not debug_panel_requested():
+        return
+
+    with st.expander("⏱️ Debug de rendimiento", expanded=False):
+        rows = SECTION_STATS.summary()
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        else:
+            st.caption("Sin muestras todavía")
+        for name, stats in (extra_stats or {}).items():
+            st.caption(f"{name}: " + " | ".join(f"{key}={value}" for key, value in stats.items()))
+        st.caption(f"Muestras en {os.path.abspath(PERF_LOG_PATH)}")
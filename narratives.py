@@ -0,0 +1,423 @@
+"""Secciones narrativas de resultados: textos por nivel de madurez y su HTML terminado.
+
+Dashboard ejecutivo, inversión por fase, beneficios del nivel y acciones
+priorizadas dependen solo del nivel de madurez (y de los nombres de fase del
+catálogo). Cada combinación se arma una vez por proceso y todas las sesiones
+reutilizan el mismo HTML y la misma figura; por sesión solo se formatean las
+tarjetas que muestran el puntaje.
+"""
+import os
+from typing import TYPE_CHECKING, NamedTuple
+
+import templates
+from catalog import CompiledCatalog, current_catalog, on_catalog_change
+from results_cache import LRUCache
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# ============ DASHBOARD EJECUTIVO ============
+
+LEVEL_DESCRIPTIONS = {
+    1: "Básico - Protección fundamental establecida",
+    2: "Intermedio - Gestión centralizada implementada",
+    3: "Avanzado - Detección inteligente activa",
+    4: "Experto - Automatización y orquestación",
+    5: "Excelencia - Zero Trust completo"
+}
+
+# ROI potencial del siguiente nivel
+ROI_POTENTIAL = {1: "25-30%", 2: "35-45%", 3: "45-60%", 4: "50-70%", 5: "60%+"}
+
+def urgency(level: int):
+    """Color, título y mensaje principal según el nivel"""
+    if level <= 2:
+        return ("#dc2626", "🚨 ACCIÓN INMEDIATA REQUERIDA",
+                "Su organización tiene vulnerabilidades críticas que requieren atención inmediata. Los riesgos superan significativamente la inversión necesaria.")
+    if level == 3:
+        return ("#ea580c", "⚠️ OPTIMIZACIÓN RECOMENDADA",
+                "Tiene una base sólida, pero hay oportunidades importantes para mejorar la eficiencia y reducir riesgos.")
+    return ("#16a34a", "✅ EXCELENTE POSICIÓN",
+            "Su organización está bien posicionada. Focus en optimización y tecnologías de vanguardia.")
+
+# ============ INVERSIÓN POR FASE ============
+
+PHASE_INVESTMENT = {
+    1: {"investment": "$100K-200K", "roi": "200-300%", "payback": "6-8 meses", "color": "#dc2626"},
+    2: {"investment": "$150K-300K", "roi": "250-400%", "payback": "4-6 meses", "color": "#ea580c"},
+    3: {"investment": "$200K-400K", "roi": "300-500%", "payback": "3-5 meses", "color": "#2563eb"},
+    4: {"investment": "$250K-500K", "roi": "400-600%", "payback": "2-4 meses", "color": "#16a34a"},
+    5: {"investment": "$200K-300K", "roi": "500%+", "payback": "2-3 meses", "color": "#7c3aed"}
+}
+# Fases que un catálogo nuevo agregue sin cifras de inversión todavía
+PHASE_INVESTMENT_DEFAULT = {"investment": "A definir", "roi": "A definir", "payback": "A definir", "color": "#64748b"}
+
+# ============ BENEFICIOS POR NIVEL ============
+
+MATURITY_BENEFITS = {
+    1: {
+        "title": "🛡️ Nivel 1 - Protección Básica Establecida",
+        "color": "#dc2626",
+        "benefits": [
+            "✅ Reducción del 60-70% en incidentes básicos de seguridad",
+            "✅ Cumplimiento de requisitos regulatorios fundamentales",
+            "✅ Visibilidad básica de amenazas en tiempo real",
+            "✅ Protección perimetral sólida contra ataques comunes"
+        ],
+        "business_impact": "🎯 ROI: Reducción de costos operativos del 15-20%",
+        "next_level_preview": "El siguiente nivel le dará gestión centralizada y mayor eficiencia"
+    },
+    2: {
+        "title": "🏗️ Nivel 2 - Gestión Centralizada y Eficiencia",
+        "color": "#ea580c",
+        "benefits": [
+            "✅ Reducción del 40% en tiempo de gestión de seguridad",
+            "✅ Visibilidad completa de toda la infraestructura",
+            "✅ Respuesta automática a incidentes básicos",
+            "✅ Consolidación de herramientas y reducción de complejidad"
+        ],
+        "business_impact": "🎯 ROI: Ahorro del 25-30% en costos operativos",
+        "next_level_preview": "El siguiente nivel implementará detección avanzada con IA"
+    },
+    3: {
+        "title": "🔍 Nivel 3 - Detección Avanzada con Inteligencia",
+        "color": "#2563eb",
+        "benefits": [
+            "✅ Detección del 95% de amenazas avanzadas en tiempo real",
+            "✅ Reducción del 80% en tiempo de investigación de incidentes",
+            "✅ Prevención proactiva de ataques zero-day",
+            "✅ Correlación inteligente de eventos de seguridad"
+        ],
+        "business_impact": "🎯 ROI: Prevención de pérdidas por $500K-2M anuales",
+        "next_level_preview": "El siguiente nivel automatizará completamente la respuesta"
+    },
+    4: {
+        "title": "🤖 Nivel 4 - Automatización y Orquestación Completa",
+        "color": "#16a34a",
+        "benefits": [
+            "✅ Respuesta automática al 90% de incidentes en < 5 minutos",
+            "✅ Reducción del 70% en personal dedicado a operaciones de seguridad",
+            "✅ Protección adaptativa basada en comportamiento",
+            "✅ Integración completa con procesos de negocio"
+        ],
+        "business_impact": "🎯 ROI: Optimización de recursos del 40-50%",
+        "next_level_preview": "El siguiente nivel implementará Zero Trust completo"
+    },
+    5: {
+        "title": "🏆 Nivel 5 - Excelencia en Zero Trust",
+        "color": "#7c3aed",
+        "benefits": [
+            "✅ Arquitectura Zero Trust completa y adaptativa",
+            "✅ Prevención del 99.9% de brechas de seguridad",
+            "✅ Optimización continua con machine learning",
+            "✅ Liderazgo en innovación de ciberseguridad"
+        ],
+        "business_impact": "🎯 ROI: Ventaja competitiva y reducción de riesgos del 60%",
+        "next_level_preview": "¡Ha alcanzado la excelencia en ciberseguridad!"
+    }
+}
+
+# Gráfico de beneficios acumulativos
+BENEFIT_ROI = [20, 30, 45, 50, 60]
+BENEFIT_COLORS = ['#dc2626', '#ea580c', '#2563eb', '#16a34a', '#7c3aed']
+
+# ============ ACCIONES PRIORIZADAS ============
+
+ACTION_PLANS = {
+    1: {
+        "immediate": {
+            "title": "🚨 CRÍTICO - Próximos 30 días",
+            "color": "#dc2626",
+            "actions": [
+                "Implementar FortiGate NGFW para protección perimetral básica",
+                "Desplegar FortiClient EMS en todos los endpoints",
+                "Configurar FortiMail para protección de correo electrónico"
+            ],
+            "investment": "$50K-100K",
+            "roi": "ROI 200-300% en 6 meses"
+        },
+        "short_term": {
+            "title": "⚠️ IMPORTANTE - Próximos 90 días",
+            "color": "#ea580c",
+            "actions": [
+                "Centralizar logs con FortiAnalyzer",
+                "Implementar MFA con FortiAuthenticator",
+                "Establecer gestión centralizada con FortiManager"
+            ],
+            "investment": "$30K-60K",
+            "roi": "Ahorro operativo 25-40%"
+        },
+        "planning": {
+            "title": "📋 PLANIFICACIÓN - Próximos 6 meses",
+            "color": "#2563eb",
+            "actions": [
+                "Diseñar arquitectura Security Fabric completa",
+                "Planificar capacitación del equipo técnico",
+                "Evaluar necesidades de bandwidth y storage"
+            ],
+            "investment": "Planificación",
+            "roi": "Fundación para crecimiento"
+        }
+    },
+    2: {
+        "immediate": {
+            "title": "🚨 CRÍTICO - Próximos 30 días",
+            "color": "#dc2626",
+            "actions": [
+                "Implementar FortiSIEM para correlación de eventos",
+                "Desplegar FortiWeb para protección de aplicaciones",
+                "Configurar FortiSandbox para análisis de malware"
+            ],
+            "investment": "$75K-150K",
+            "roi": "Prevención de incidentes $500K+"
+        },
+        "short_term": {
+            "title": "⚠️ IMPORTANTE - Próximos 90 días",
+            "color": "#ea580c",
+            "actions": [
+                "Automatizar respuesta a incidentes básicos",
+                "Implementar segmentación de red avanzada",
+                "Establecer SOC básico o partnership"
+            ],
+            "investment": "$40K-80K",
+            "roi": "Reducción 60% tiempo respuesta"
+        },
+        "planning": {
+            "title": "📋 PLANIFICACIÓN - Próximos 6 meses",
+            "color": "#2563eb",
+            "actions": [
+                "Evaluar FortiEDR para detección avanzada",
+                "Planificar integración con herramientas existentes",
+                "Desarrollar playbooks de respuesta"
+            ],
+            "investment": "Planificación",
+            "roi": "Preparación para Nivel 3"
+        }
+    },
+    3: {
+        "immediate": {
+            "title": "🚨 CRÍTICO - Próximos 30 días",
+            "color": "#dc2626",
+            "actions": [
+                "Implementar FortiSOAR para orquestación automática",
+                "Desplegar FortiXDR para detección extendida",
+                "Configurar FortiDeceptor para detección temprana"
+            ],
+            "investment": "$100K-200K",
+            "roi": "Automatización 70% respuestas"
+        },
+        "short_term": {
+            "title": "⚠️ IMPORTANTE - Próximos 90 días",
+            "color": "#ea580c",
+            "actions": [
+                "Optimizar reglas de correlación automática",
+                "Implementar threat hunting proactivo",
+                "Integrar con threat intelligence feeds"
+            ],
+            "investment": "$50K-100K",
+            "roi": "Reducción 80% falsos positivos"
+        },
+        "planning": {
+            "title": "📋 PLANIFICACIÓN - Próximos 6 meses",
+            "color": "#2563eb",
+            "actions": [
+                "Evaluar arquitectura Zero Trust",
+                "Planificar FortiCWP para workloads cloud",
+                "Diseñar métricas avanzadas de seguridad"
+            ],
+            "investment": "Planificación",
+            "roi": "Evolución hacia Nivel 4"
+        }
+    },
+    4: {
+        "immediate": {
+            "title": "🚨 CRÍTICO - Próximos 30 días",
+            "color": "#dc2626",
+            "actions": [
+                "Implementar FortiCNAPP para aplicaciones cloud",
+                "Desplegar FortiPAM para accesos privilegiados",
+                "Configurar Zero Trust con FortiNAC avanzado"
+            ],
+            "investment": "$150K-300K",
+            "roi": "Protección 99.9% workloads"
+        },
+        "short_term": {
+            "title": "⚠️ IMPORTANTE - Próximos 90 días",
+            "color": "#ea580c",
+            "actions": [
+                "Optimizar machine learning algorithms",
+                "Implementar behavioral analytics",
+                "Automatizar compliance reporting"
+            ],
+            "investment": "$75K-150K",
+            "roi": "Ahorro 90% esfuerzo compliance"
+        },
+        "planning": {
+            "title": "📋 PLANIFICACIÓN - Próximos 6 meses",
+            "color": "#2563eb",
+            "actions": [
+                "Evaluar FortiDevSec para DevSecOps",
+                "Planificar integración con CI/CD pipelines",
+                "Diseñar arquitectura para Nivel 5"
+            ],
+            "investment": "Planificación",
+            "roi": "Preparación excelencia"
+        }
+    },
+    5: {
+        "immediate": {
+            "title": "🚨 OPTIMIZACIÓN - Próximos 30 días",
+            "color": "#16a34a",
+            "actions": [
+                "Optimizar algoritmos de IA existentes",
+                "Implementar analytics predictivos avanzados",
+                "Configurar self-healing automático"
+            ],
+            "investment": "$75K-150K",
+            "roi": "Optimización continua"
+        },
+        "short_term": {
+            "title": "⚠️ INNOVACIÓN - Próximos 90 días",
+            "color": "#2563eb",
+            "actions": [
+                "Evaluar tecnologías emergentes",
+                "Implementar quantum-ready security",
+                "Desarrollar capabilities propietarias"
+            ],
+            "investment": "$100K-200K",
+            "roi": "Ventaja competitiva"
+        },
+        "planning": {
+            "title": "📋 LIDERAZGO - Próximos 6 meses",
+            "color": "#7c3aed",
+            "actions": [
+                "Liderar estándares de industria",
+                "Desarrollar partnerships estratégicos",
+                "Compartir best practices con ecosystem"
+            ],
+            "investment": "Liderazgo",
+            "roi": "Posición de mercado"
+        }
+    }
+}
+
+# ============ HTML TERMINADO ============
+
+class NarrativeSections(NamedTuple):
+    executive_banner: str
+    executive_roi_card: str
+    executive_urgency: str
+    timeline: str
+    benefits_banner: str
+    benefits_card: str
+    benefits_figure: "go.Figure"
+    actions: str
+
+# 5 niveles por versión de catálogo; un cambio de catálogo en caliente vacía el caché
+NARRATIVE_CACHE = LRUCache(int(os.environ.get("NIST_NARRATIVE_CACHE_ENTRIES", "20")))
+
+def build_timeline(level: int, catalog: CompiledCatalog = None) -> str:
+    tiles = []
+    for phase_num, phase_data in (catalog or current_catalog()).phases.items():
+        investment_info = PHASE_INVESTMENT.get(phase_num, PHASE_INVESTMENT_DEFAULT)
+        if phase_num == level:
+            state, status_text = "current", "🎯 NIVEL ACTUAL"
+        elif phase_num < level:
+            state, status_text = "completed", "✅ COMPLETADO"
+        else:
+            state, status_text = "", "📅 FUTURO"
+        tiles.append(templates.PHASE_TILE.format(
+            state=state,
+            color=investment_info['color'],
+            phase=phase_num,
+            name=phase_data['name'],
+            investment=investment_info['investment'],
+            roi=investment_info['roi'],
+            payback=investment_info['payback'],
+            status=status_text
+        ))
+    return "".join([
+        templates.banner("banner-green", "💰 INVERSIÓN Y RETORNO POR FASE",
+                         "Costos estimados y ROI esperado para cada nivel de madurez"),
+        '<div class="card-grid cols-5">', *tiles, '</div>'
+    ])
+
+def build_benefits_card(level: int) -> str:
+    current_benefits = MATURITY_BENEFITS[level]
+    return templates.BENEFITS_CARD.format(
+        color=current_benefits['color'],
+        title=current_benefits['title'],
+        benefits=templates.list_items(current_benefits['benefits']),
+        business_impact=current_benefits['business_impact'],
+        preview=templates.NEXT_LEVEL_PREVIEW.format(text=current_benefits['next_level_preview'])
+        if level < 5 else ""
+    )
+
+def build_benefits_figure(level: int) -> "go.Figure":
+    # Plotly solo hace falta en la página de resultados
+    import plotly.graph_objects as go
+
+    fig_benefits = go.Figure()
+    for bar_level, roi, color in zip(range(1, 6), BENEFIT_ROI, BENEFIT_COLORS):
+        fig_benefits.add_trace(go.Bar(
+            x=[bar_level],
+            y=[roi],
+            marker_color=color,
+            opacity=1.0 if bar_level <= level else 0.3,
+            showlegend=False
+        ))
+
+    fig_benefits.add_trace(go.Scatter(
+        x=[level],
+        y=[BENEFIT_ROI[level - 1]],
+        mode='markers+text',
+        marker=dict(size=20, color='#dc2626', symbol='star'),
+        text=['USTED'],
+        textposition='top center',
+        showlegend=False
+    ))
+
+    fig_benefits.update_layout(
+        title="📈 ROI Acumulativo por Nivel",
+        xaxis_title="Nivel de Madurez",
+        yaxis_title="ROI (%)",
+        height=300,
+        margin=dict(t=50, b=30, l=30, r=30)
+    )
+    return fig_benefits
+
+def build_actions(level: int) -> str:
+    current_plan = ACTION_PLANS.get(level, ACTION_PLANS[1])
+    # Las 3 fases de acción en un solo elemento
+    return "".join([
+        templates.banner("banner-red", "🎯 SUS PRÓXIMOS 3 PASOS CRÍTICOS", "Acciones priorizadas por impacto y urgencia"),
+        *(templates.ACTION_CARD.format(
+            color=phase_data['color'],
+            title=phase_data['title'],
+            actions=templates.list_items(phase_data['actions']),
+            investment=phase_data['investment'],
+            roi=phase_data['roi']
+        ) for phase_data in current_plan.values())
+    ])
+
+def build_narrative_sections(level: int, catalog: CompiledCatalog = None) -> NarrativeSections:
+    urgency_color, urgency_title, message = urgency(level)
+    next_level = min(level + 1, 5)
+    return NarrativeSections(
+        executive_banner=templates.banner("banner-executive", "📋 RESUMEN EJECUTIVO",
+                                          "Su posición actual en ciberseguridad y próximos pasos recomendados"),
+        executive_roi_card=templates.ROI_CARD.format(roi=ROI_POTENTIAL.get(next_level, "60%+")),
+        executive_urgency=templates.URGENCY_BOX.format(color=urgency_color, title=urgency_title, message=message),
+        timeline=build_timeline(level, catalog),
+        benefits_banner=templates.banner("banner-purple", "💎 BENEFICIOS DE SU NIVEL DE MADUREZ ACTUAL", tag="h3"),
+        benefits_card=build_benefits_card(level),
+        benefits_figure=build_benefits_figure(level),
+        actions=build_actions(level)
+    )
+
+def narrative_sections(level: int) -> NarrativeSections:
+    """HTML y figura de las secciones narrativas del nivel, compartidos por todo el proceso"""
+    catalog = current_catalog()
+    return NARRATIVE_CACHE.get_or_create((level, catalog.version), lambda: build_narrative_sections(level, catalog))
+
+on_catalog_change(lambda previous, catalog: NARRATIVE_CACHE.clear())
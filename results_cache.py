@@ -0,0 +1,87 @@
+"""Caché LRU de proceso para resultados y figuras compartidos entre sesiones."""
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, NamedTuple, Tuple
+
+from catalog import CompiledCatalog, current_catalog, on_catalog_change
+from scoring import AssessmentResults, build_assessment_results
+
+class LRUCache:
+    """LRU thread-safe con tamaño máximo y contadores de aciertos, fallos y desalojos"""
+    def __init__(self, max_entries: int):
+        self.max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], object]):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Se construye fuera del lock para no serializar sesiones con claves distintas
+        value = factory()
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+class ResultsPayload(NamedTuple):
+    results: AssessmentResults
+    roadmap_figure: "go.Figure"
+
+RESULTS_CACHE = LRUCache(int(os.environ.get("NIST_RESULTS_CACHE_ENTRIES", "512")))
+
+def results_signature(product_mask: int, third_party_mask: int, industry: str, company_size: str,
+                      catalog: CompiledCatalog = None) -> Tuple:
+    """Firma canónica de un estado de resultados"""
+    return (product_mask, third_party_mask, industry, company_size, (catalog or current_catalog()).version)
+
+def get_results_payload(product_mask: int, third_party_mask: int, industry: str, company_size: str) -> ResultsPayload:
+    """Resultados y figura del roadmap, reutilizados por toda sesión con la misma firma"""
+    # Una sola versión de catálogo para la firma, los resultados y la figura
+    catalog = current_catalog()
+
+    def build() -> ResultsPayload:
+        # Plotly entra recién con la primera figura; el caché se puede importar sin él
+        from roadmap_chart import build_roadmap_figure, product_layout
+
+        results = build_assessment_results(product_mask, third_party_mask, catalog)
+        return ResultsPayload(results, build_roadmap_figure(results, product_layout(catalog)))
+
+    return RESULTS_CACHE.get_or_create(
+        results_signature(product_mask, third_party_mask, industry, company_size, catalog), build
+    )
+
+# Todas las entradas dependen del catálogo: con una versión nueva ya no se vuelven a pedir
+on_catalog_change(lambda previous, catalog: RESULTS_CACHE.clear())
@@ -0,0 +1,242 @@
+"""Figura del roadmap de madurez con trazas consolidadas y posiciones deterministas."""
+import numpy as np
+import plotly.graph_objects as go
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+
+from catalog import CompiledCatalog, current_catalog
+from scoring import AssessmentResults
+
+# Semilla fija: las posiciones no cambian entre reruns y la figura es cacheable
+LAYOUT_SEED = 20240501
+
+LEVEL_COLORS = ['#fef2f2', '#fef3e2', '#eff6ff', '#ecfdf5', '#faf5ff']
+LEVEL_BORDERS = ['#fecaca', '#fed7aa', '#bfdbfe', '#bbf7d0', '#e9d5ff']
+LEVEL_NAMES = ['Nivel 1\nInicial', 'Nivel 2\nBásico', 'Nivel 3\nIntermedio', 'Nivel 4\nAvanzado', 'Nivel 5\nExcelencia']
+LEVEL_DESCRIPTIONS = ['Fundamentos\n(0-3 meses)', 'Consolidación\n(3-6 meses)', 'Detección Avanzada\n(6-12 meses)',
+                      'Optimización\n(12-18 meses)', 'Zero Trust & AI\n(18-24 meses)']
+
+CATEGORY_Y_RANGES = {
+    "Network Security": (1.0, 2.0),
+    "Endpoint Security": (2.1, 2.8),
+    "Email & Web Security": (2.9, 3.6),
+    "Identity & Access Management": (1.5, 2.5),
+    "SOC & Analytics": (3.7, 4.4),
+    "Management & Orchestration": (4.5, 5.2),
+    "Cloud Security": (3.8, 4.6),
+    "OT & IoT Security": (3.2, 4.0)
+}
+
+IMPACT_COLORS = {5: '#dc2626', 4: '#ea580c', 3: '#3b82f6', 2: '#8b5cf6', 1: '#64748b'}
+IMPLEMENTED_COLOR = '#059669'
+
+PIN_Y = 5.6
+
+def maturity_curve(x):
+    return 0.8 + 4.2 * (1 - np.exp(-0.8 * (x - 0.6))) + 0.1 * np.sin(2 * np.pi * (x - 0.6) / 5)
+
+CURVE_X = np.linspace(0.6, 5.4, 20)
+CURVE_Y = maturity_curve(CURVE_X)
+MILESTONE_X = np.arange(1, 6)
+MILESTONE_Y = maturity_curve(MILESTONE_X)
+
+class ProductLayout:
+    """Tabla precalculada de posición, etiqueta y hover de cada producto"""
+    def __init__(self, catalog: CompiledCatalog, seed: int = LAYOUT_SEED):
+        jitter = np.random.default_rng(seed).uniform(-0.05, 0.05, catalog.n_products)
+        phase_counts: Dict[int, int] = {}
+        x, y = [], []
+        self.labels: List[str] = []
+        self.hover: Tuple[List[str], List[str]] = ([], [])
+
+        for product in catalog.products:
+            y_min, y_max = CATEGORY_Y_RANGES.get(product.category, (2.0, 3.0))
+            count = phase_counts.get(product.implementation_phase, 0)
+            phase_counts[product.implementation_phase] = count + 1
+
+            x.append(product.implementation_phase + (count % 5 - 2) * 0.05)
+            y.append(y_min + (y_max - y_min) * (count / 10.0) + jitter[product.index])
+
+            label = product.name.replace('Forti', '').replace(' for OT', '').strip()
+            self.labels.append(label[:10] + '...' if len(label) > 12 else label)
+
+            for implemented, hover in zip((False, True), self.hover):
+                hover.append(
+                    f"<b>{product.name}</b><br>"
+                    f"📁 {product.category}<br>"
+                    f"📊 Fase {product.implementation_phase} - Impacto {product.impact}<br>"
+                    f"🎯 {product.nist_function}<br>"
+                    f"{'✅ Implementado' if implemented else '⭕ Recomendado'}<br>"
+                    f"💡 {product.description[:60]}..."
+                )
+
+        self.x = np.round(np.array(x), 4)
+        self.y = np.round(np.array(y), 4)
+        self.impact = catalog.impact
+
+def product_layout(catalog: CompiledCatalog = None) -> ProductLayout:
+    """Tabla de posiciones de la versión de catálogo; la anterior se conserva durante un cambio en caliente"""
+    return _product_layout(catalog or current_catalog())
+
+@lru_cache(maxsize=2)
+def _product_layout(catalog: CompiledCatalog) -> ProductLayout:
+    return ProductLayout(catalog)
+
+def _product_trace(layout: ProductLayout, indexes: np.ndarray, implemented: bool, impact: int = 0) -> go.Scatter:
+    if implemented:
+        marker = dict(size=12, color=IMPLEMENTED_COLOR, symbol='circle',
+                      line=dict(color='#065f46', width=2), opacity=0.9)
+    else:
+        color = IMPACT_COLORS.get(impact, '#64748b')
+        marker = dict(size=6 + impact, color=color, symbol='circle-open',
+                      line=dict(color=color, width=1.5), opacity=0.7)
+
+    return go.Scatter(
+        x=layout.x[indexes],
+        y=layout.y[indexes],
+        mode='markers+text',
+        marker=marker,
+        text=[layout.labels[i] for i in indexes],
+        textposition="top center",
+        textfont=dict(size=6, color='#1e293b', family="Inter"),
+        hovertext=[layout.hover[implemented][i] for i in indexes],
+        hovertemplate="%{hovertext}<extra></extra>",
+        showlegend=False,
+        name='Implementados' if implemented else f'Recomendados - Impacto {impact}'
+    )
+
+def _background_layout() -> Tuple[List[Dict], List[Dict]]:
+    shapes, annotations = [], []
+    for i in range(5):
+        shapes.append(dict(
+            type="rect", x0=i+0.6, y0=0, x1=i+1.4, y1=6,
+            fillcolor=LEVEL_COLORS[i], opacity=0.3, layer="below",
+            line=dict(color=LEVEL_BORDERS[i], width=1, dash='dot')
+        ))
+        if i < 4:
+            shapes.append(dict(
+                type="line", x0=i+1.4, y0=0, x1=i+1.4, y1=6,
+                line=dict(color='#cbd5e1', width=1.5, dash='solid'), layer="below"
+            ))
+        annotations.append(dict(
+            x=i+1, y=5.8, text=f"<b>{LEVEL_NAMES[i]}</b>", showarrow=False,
+            font=dict(size=10, color='#1e293b', family="Inter"), align="center",
+            bgcolor="rgba(255, 255, 255, 0.9)", bordercolor=LEVEL_BORDERS[i], borderwidth=1, borderpad=4
+        ))
+        annotations.append(dict(
+            x=i+1, y=0.4, text=LEVEL_DESCRIPTIONS[i], showarrow=False,
+            font=dict(size=8, color='#64748b', family="Inter"), align="center"
+        ))
+
+    # LEYENDA
+    annotations.append(dict(
+        x=2.5, y=0.7,
+        text=(
+            "🗺️ <b>Portfolio Completo Fortinet Security Fabric</b><br>"
+            "🟢 <b>Verde:</b> Tecnología Implementada | ⚪ <b>Círculos:</b> Recomendada para implementar<br>"
+            "📈 <b>Tamaño = Nivel de Impacto</b> | 📍 <b>Pin Rojo:</b> Su posición actual de madurez<br>"
+            "💙 <b>Curva Azul:</b> Trayectoria natural de evolución hacia la excelencia"
+        ),
+        showarrow=False, font=dict(size=9, color='#374151', family="Inter"), align="center",
+        bgcolor="rgba(248, 250, 252, 0.98)", bordercolor="#cbd5e1", borderwidth=1, borderpad=10
+    ))
+    return shapes, annotations
+
+BASE_LAYOUT = dict(
+    title={
+        'text': "🛡️ FORTINET SECURITY FABRIC - ROADMAP DE MADUREZ PROFESIONAL",
+        'x': 0.5,
+        'font': {'size': 16, 'color': '#1e293b', 'family': "Inter Bold"}
+    },
+    height=550,
+    showlegend=False,
+    plot_bgcolor='rgba(248, 250, 252, 0.5)',
+    paper_bgcolor='white',
+    hovermode='closest',
+    margin=dict(t=60, b=50, l=40, r=40),
+    xaxis=dict(
+        range=[0.5, 5.5],
+        title={'text': "→ Evolución Natural de Madurez en Ciberseguridad",
+               'font': {'size': 12, 'color': '#374151', 'family': "Inter"}},
+        tickvals=[1, 2, 3, 4, 5],
+        ticktext=['Nivel 1', 'Nivel 2', 'Nivel 3', 'Nivel 4', 'Nivel 5'],
+        showgrid=False, zeroline=False, tickfont={'size': 10, 'family': "Inter"},
+        linecolor='#cbd5e1', linewidth=1
+    ),
+    yaxis=dict(
+        range=[0, 6],
+        title={'text': "↑ Amplitud y Profundidad de Cobertura",
+               'font': {'size': 12, 'color': '#374151', 'family': "Inter"}},
+        showticklabels=False, showgrid=True, gridcolor='rgba(203, 213, 225, 0.3)',
+        zeroline=False, linecolor='#cbd5e1', linewidth=1
+    )
+)
+
+class RoadmapSkeleton(NamedTuple):
+    """Parte fija de la figura: fondos por nivel, leyenda, curva de madurez e hitos"""
+    shapes: Tuple[Dict, ...]
+    annotations: Tuple[Dict, ...]
+    traces: Tuple[go.Scatter, ...]
+
+@lru_cache(maxsize=1)
+def roadmap_skeleton() -> RoadmapSkeleton:
+    """Se arma una vez por proceso; las trazas ya validadas se copian más rápido que crearlas"""
+    shapes, annotations = _background_layout()
+    traces = (
+        # CURVA DE MADUREZ
+        go.Scatter(x=CURVE_X, y=CURVE_Y, mode='lines',
+                   line=dict(color='rgba(67, 56, 202, 0.8)', width=5, shape='spline', smoothing=1.3),
+                   showlegend=False, name='Curva de Madurez'),
+        go.Scatter(x=CURVE_X, y=CURVE_Y - 0.1, mode='lines',
+                   line=dict(color='rgba(67, 56, 202, 0.2)', width=8), showlegend=False, fill=None),
+        # Hitos en la curva
+        go.Scatter(x=MILESTONE_X, y=MILESTONE_Y, mode='markers',
+                   marker=dict(size=10, color='#4338ca', symbol='circle', line=dict(color='white', width=2)),
+                   showlegend=False)
+    )
+    return RoadmapSkeleton(tuple(shapes), tuple(annotations), traces)
+
+def build_roadmap_figure(results: AssessmentResults, layout: ProductLayout = None) -> go.Figure:
+    """Roadmap completo: esqueleto fijo, productos agrupados por estado/impacto y pin de posición"""
+    layout = layout or product_layout()
+    current_level = results.maturity_level
+    skeleton = roadmap_skeleton()
+    shapes, annotations = list(skeleton.shapes), list(skeleton.annotations)
+    traces = list(skeleton.traces)
+
+    # DISTRIBUCIÓN DE PRODUCTOS: una traza de implementados y una por nivel de impacto recomendado
+    implemented = np.array(results.implemented, dtype=bool)
+    implemented_indexes = np.flatnonzero(implemented)
+    if implemented_indexes.size:
+        traces.append(_product_trace(layout, implemented_indexes, True))
+    for impact in sorted(set(layout.impact.tolist()), reverse=True):
+        indexes = np.flatnonzero(~implemented & (layout.impact == impact))
+        if indexes.size:
+            traces.append(_product_trace(layout, indexes, False, impact))
+
+    # PIN PROFESIONAL "USTED ESTÁ AQUÍ"
+    traces.append(go.Scatter(
+        x=[current_level], y=[PIN_Y], mode='markers+text',
+        marker=dict(size=25, color='#dc2626', symbol='diamond', line=dict(color='#7f1d1d', width=3)),
+        text=['📍'], textfont=dict(size=16, color='#ffffff'), showlegend=False, name="Posición Actual"
+    ))
+    annotations.append(dict(
+        x=current_level, y=PIN_Y - 0.3, text="<b>SU POSICIÓN ACTUAL</b>",
+        showarrow=True, arrowhead=2, arrowsize=1, arrowwidth=2, arrowcolor="#dc2626", ax=0, ay=-30,
+        font=dict(size=10, color='#dc2626', family="Inter Bold"),
+        bgcolor="rgba(255, 255, 255, 0.95)", bordercolor="#dc2626", borderwidth=2, borderpad=6
+    ))
+
+    # Indicador en la curva
+    curve_y = float(MILESTONE_Y[current_level - 1])
+    traces.append(go.Scatter(
+        x=[current_level], y=[curve_y], mode='markers',
+        marker=dict(size=20, color='#dc2626', symbol='circle', line=dict(color='#ffffff', width=4)),
+        showlegend=False
+    ))
+    shapes.append(dict(
+        type="line", x0=current_level, y0=PIN_Y-0.1, x1=current_level, y1=curve_y+0.1,
+        line=dict(color='#dc2626', width=2, dash='dot'), layer="above"
+    ))
+
+    return go.Figure(data=traces, layout=dict(BASE_LAYOUT, shapes=shapes, annotations=annotations))
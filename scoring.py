@@ -0,0 +1,326 @@
+"""Kernel vectorizado de madurez NIST sobre el catálogo compilado."""
+import numpy as np
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, NamedTuple, Tuple
+
+from catalog import NIST_FUNCTIONS, CatalogProduct, CompiledCatalog, current_catalog, on_catalog_change
+
+# Crédito parcial por categoría cubierta solo con soluciones de terceros
+NON_FORTINET_CREDIT = 0.6
+
+# Umbrales de puntaje para los niveles 2..5
+MATURITY_THRESHOLDS = np.array([40, 60, 75, 90])
+
+# Combinaciones de máscaras memoizadas por proceso
+SCORE_CACHE_SIZE = 4096
+
+def get_maturity_level(score: float) -> int:
+    if score >= 90: return 5
+    elif score >= 75: return 4
+    elif score >= 60: return 3
+    elif score >= 40: return 2
+    else: return 1
+
+def get_maturity_levels(scores: np.ndarray) -> np.ndarray:
+    """Versión vectorizada de get_maturity_level"""
+    return np.searchsorted(MATURITY_THRESHOLDS, scores, side="right") + 1
+
+def score_selection_matrix(products, third_party,
+                           catalog: CompiledCatalog = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Puntúa N assessments en bloque.
+    
+    `products` es una matriz booleana N × productos (orden de catálogo) y
+    `third_party` una matriz N × categorías. Devuelve los puntajes por función
+    (N × funciones NIST), el puntaje global (N,) y el nivel de madurez (N,).
+    """
+    catalog = catalog or current_catalog()
+    products = np.asarray(products, dtype=np.float64).reshape(-1, catalog.n_products)
+    third_party = np.asarray(third_party, dtype=bool).reshape(-1, catalog.n_categories)
+    
+    selected_impact = products @ catalog.function_matrix
+    
+    # Categorías con terceros y sin ningún producto Fortinet reciben crédito parcial
+    fortinet_per_category = products @ catalog.category_matrix
+    credited = (third_party & (fortinet_per_category == 0)).astype(np.float64)
+    selected_impact += NON_FORTINET_CREDIT * (credited @ catalog.category_function_impact)
+    
+    totals = catalog.function_totals
+    percentage = np.divide(selected_impact, totals, out=np.zeros_like(selected_impact),
+                           where=totals > 0) * 100
+    
+    overall_score = percentage @ catalog.function_weights
+    function_scores = np.minimum(percentage, 100)
+    return function_scores, overall_score, get_maturity_levels(overall_score)
+
+def score_assessment(product_flags, third_party_flags,
+                     catalog: CompiledCatalog = None) -> Dict:
+    """Ruta de un solo assessment (N=1) sobre el mismo kernel que el modo batch"""
+    catalog = catalog or current_catalog()
+    function_scores, overall_score, maturity_level = score_selection_matrix(
+        [product_flags], [third_party_flags], catalog
+    )
+    return {
+        "function_scores": dict(zip(NIST_FUNCTIONS, function_scores[0].tolist())),
+        "overall_score": float(overall_score[0]),
+        "maturity_level": int(maturity_level[0])
+    }
+
+# ============ SELECCIÓN COMO MÁSCARAS DE BITS ============
+
+def count_bits(mask: int) -> int:
+    return bin(mask).count("1")
+
+def is_bit_set(mask: int, position: int) -> bool:
+    return bool((mask >> position) & 1)
+
+def set_bit(mask: int, position: int, value: bool) -> int:
+    return mask | (1 << position) if value else mask & ~(1 << position)
+
+def mask_to_flags(mask: int, size: int) -> np.ndarray:
+    """Expande una máscara a un vector booleano de `size` posiciones"""
+    raw = np.frombuffer(mask.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:size].astype(bool)
+
+@lru_cache(maxsize=SCORE_CACHE_SIZE)
+def _score_masks(product_mask: int, third_party_mask: int,
+                 catalog: CompiledCatalog) -> Tuple[Tuple[float, ...], float, int]:
+    function_scores, overall_score, maturity_level = score_selection_matrix(
+        mask_to_flags(product_mask, catalog.n_products),
+        mask_to_flags(third_party_mask, catalog.n_categories),
+        catalog
+    )
+    return tuple(function_scores[0].tolist()), float(overall_score[0]), int(maturity_level[0])
+
+def score_masks(product_mask: int, third_party_mask: int, catalog: CompiledCatalog = None) -> Dict:
+    """Puntaje memoizado por máscaras y catálogo; cada llamada devuelve un dict nuevo"""
+    function_scores, overall_score, maturity_level = _score_masks(product_mask, third_party_mask,
+                                                                  catalog or current_catalog())
+    return {
+        "function_scores": dict(zip(NIST_FUNCTIONS, function_scores)),
+        "overall_score": overall_score,
+        "maturity_level": maturity_level
+    }
+
+# ============ ENTRADAS PLANAS (SIN SESSION STATE) ============
+
+def products_to_mask(products: Iterable[str], catalog: CompiledCatalog = None) -> int:
+    """Máscara de productos a partir de claves de catálogo o nombres de producto"""
+    catalog = catalog or current_catalog()
+    mask = 0
+    for product in products:
+        if product not in catalog.product_lookup:
+            raise ValueError(f"Producto desconocido: {product}")
+        mask |= 1 << catalog.product_lookup[product]
+    return mask
+
+def categories_to_mask(categories: Iterable[str], catalog: CompiledCatalog = None) -> int:
+    catalog = catalog or current_catalog()
+    mask = 0
+    for category in categories:
+        if category not in catalog.category_position:
+            raise ValueError(f"Categoría desconocida: {category}")
+        mask |= 1 << catalog.category_position[category]
+    return mask
+
+def calculate_enhanced_maturity(selected_products: Iterable[str] = (),
+                                third_party_categories: Iterable[str] = ()) -> Dict:
+    """Cálculo de madurez sobre listas de productos y categorías con terceros"""
+    catalog = current_catalog()
+    return score_masks(products_to_mask(selected_products, catalog),
+                       categories_to_mask(third_party_categories, catalog), catalog)
+
+def translate_masks(product_mask: int, third_party_mask: int,
+                    source: CompiledCatalog, target: CompiledCatalog) -> Tuple[int, int]:
+    """Máscaras de una versión de catálogo a otra, por clave de producto y nombre de categoría.
+    
+    Los productos y categorías que ya no existen en `target` se descartan.
+    """
+    product_flags = mask_to_flags(product_mask, source.n_products)
+    third_party_flags = mask_to_flags(third_party_mask, source.n_categories)
+    translated_products = 0
+    for key, selected in zip(source.product_keys, product_flags.tolist()):
+        if selected and key in target.product_index:
+            translated_products |= 1 << target.product_index[key]
+    translated_third_party = 0
+    for category, selected in zip(source.categories, third_party_flags.tolist()):
+        if selected and category in target.category_position:
+            translated_third_party |= 1 << target.category_position[category]
+    return translated_products, translated_third_party
+
+# ============ SCORING INCREMENTAL ============
+
+class ScoringState:
+    """Acumuladores de un assessment en curso: cada cambio de checkbox se aplica como un delta O(1).
+    
+    Los impactos se acumulan en enteros de 1/25 de punto ponderado (un producto
+    aporta 5 × impacto × nivel, el crédito de terceros 3 × impacto × nivel), de
+    modo que marcar y desmarcar repetidamente nunca acumula error de redondeo.
+    """
+    def __init__(self, catalog: CompiledCatalog = None):
+        catalog = catalog or current_catalog()
+        self.catalog = catalog
+        self.product_mask = 0
+        self.third_party_mask = 0
+        self.fortinet_count = 0
+        self.third_party_count = 0
+        self.categories_covered = 0
+        self.category_counts = [0] * catalog.n_categories
+        self.selected_units = [0] * catalog.n_functions
+        self._total_units = [5 * int(units) for units in catalog.function_total_units]
+        self._results = None
+    
+    @classmethod
+    def from_masks(cls, product_mask: int, third_party_mask: int,
+                   catalog: CompiledCatalog = None) -> "ScoringState":
+        state = cls(catalog)
+        catalog = state.catalog
+        for position in range(catalog.n_products):
+            if is_bit_set(product_mask, position):
+                state.set_product(position, True)
+        for position in range(catalog.n_categories):
+            if is_bit_set(third_party_mask, position):
+                state.set_third_party(position, True)
+        return state
+    
+    def _is_covered(self, category: int) -> bool:
+        return self.category_counts[category] > 0 or is_bit_set(self.third_party_mask, category)
+    
+    def _is_credited(self, category: int) -> bool:
+        return self.category_counts[category] == 0 and is_bit_set(self.third_party_mask, category)
+    
+    def _update_category(self, category: int, covered_before: bool, credited_before: bool):
+        credited = self._is_credited(category)
+        if credited != credited_before:
+            sign = 1 if credited else -1
+            for function, units in enumerate(self.catalog.category_function_units[category]):
+                self.selected_units[function] += sign * 3 * int(units)
+        self.categories_covered += int(self._is_covered(category)) - int(covered_before)
+        self._results = None
+    
+    def set_product(self, position: int, selected: bool):
+        if is_bit_set(self.product_mask, position) == selected:
+            return
+        category = int(self.catalog.category_index[position])
+        covered_before, credited_before = self._is_covered(category), self._is_credited(category)
+        
+        sign = 1 if selected else -1
+        self.product_mask = set_bit(self.product_mask, position, selected)
+        self.fortinet_count += sign
+        self.category_counts[category] += sign
+        self.selected_units[int(self.catalog.function_index[position])] += sign * 5 * int(self.catalog.impact_units[position])
+        self._update_category(category, covered_before, credited_before)
+    
+    def set_third_party(self, category: int, selected: bool):
+        if is_bit_set(self.third_party_mask, category) == selected:
+            return
+        covered_before, credited_before = self._is_covered(category), self._is_credited(category)
+        
+        self.third_party_mask = set_bit(self.third_party_mask, category, selected)
+        self.third_party_count += 1 if selected else -1
+        self._update_category(category, covered_before, credited_before)
+    
+    def results(self) -> Dict:
+        """Mismo formato que score_masks, calculado desde los acumuladores"""
+        if self._results is None:
+            function_scores = {}
+            overall_score = 0.0
+            for function, selected, total, weight in zip(NIST_FUNCTIONS, self.selected_units, self._total_units,
+                                                         self.catalog.function_weights.tolist()):
+                percentage = (selected / total) * 100 if total > 0 else 0.0
+                function_scores[function] = min(percentage, 100)
+                overall_score += percentage * weight
+            self._results = {
+                "function_scores": function_scores,
+                "overall_score": overall_score,
+                "maturity_level": get_maturity_level(overall_score)
+            }
+        return dict(self._results, function_scores=dict(self._results["function_scores"]))
+
+# ============ RESULTADOS MATERIALIZADOS ============
+
+# Estado de cobertura por categoría
+COVERAGE_HYBRID = "hybrid"
+COVERAGE_FORTINET = "fortinet"
+COVERAGE_THIRD_PARTY = "third_party"
+COVERAGE_NONE = "none"
+
+class CategoryCoverage(NamedTuple):
+    category: str
+    status: str
+    implemented_products: Tuple[str, ...]
+    total_products: int
+    has_third_party: bool
+
+class PhaseProduct(NamedTuple):
+    product: CatalogProduct
+    implemented: bool
+
+class AssessmentResults(NamedTuple):
+    """Todo lo que muestran las vistas de resultados, calculado en una sola pasada"""
+    product_mask: int
+    third_party_mask: int
+    function_scores: Mapping[str, float]
+    overall_score: float
+    maturity_level: int
+    implemented: Tuple[bool, ...]
+    category_coverage: Tuple[CategoryCoverage, ...]
+    phase_products: Mapping[int, Tuple[PhaseProduct, ...]]
+    fortinet_count: int
+    third_party_count: int
+    categories_covered: int
+    total_products: int
+    total_categories: int
+
+def build_assessment_results(product_mask: int, third_party_mask: int,
+                             catalog: CompiledCatalog = None) -> AssessmentResults:
+    """Resultados inmutables por par de máscaras y catálogo; se comparten entre vistas y sesiones"""
+    return _build_assessment_results(product_mask, third_party_mask, catalog or current_catalog())
+
+@lru_cache(maxsize=SCORE_CACHE_SIZE)
+def _build_assessment_results(product_mask: int, third_party_mask: int,
+                              catalog: CompiledCatalog) -> AssessmentResults:
+    scores = score_masks(product_mask, third_party_mask, catalog)
+    implemented = tuple(mask_to_flags(product_mask, catalog.n_products).tolist())
+    
+    category_coverage = []
+    for position, (category, products) in enumerate(catalog.products_by_category.items()):
+        implemented_products = tuple(product.name for product in products if implemented[product.index])
+        has_third_party = is_bit_set(third_party_mask, position)
+        if implemented_products and has_third_party:
+            status = COVERAGE_HYBRID
+        elif implemented_products:
+            status = COVERAGE_FORTINET
+        elif has_third_party:
+            status = COVERAGE_THIRD_PARTY
+        else:
+            status = COVERAGE_NONE
+        category_coverage.append(CategoryCoverage(category, status, implemented_products, len(products), has_third_party))
+    
+    phase_products = MappingProxyType({
+        phase: tuple(PhaseProduct(product, implemented[product.index]) for product in products)
+        for phase, products in catalog.products_by_phase.items()
+    })
+    
+    return AssessmentResults(
+        product_mask=product_mask,
+        third_party_mask=third_party_mask,
+        function_scores=MappingProxyType(scores["function_scores"]),
+        overall_score=scores["overall_score"],
+        maturity_level=scores["maturity_level"],
+        implemented=implemented,
+        category_coverage=tuple(category_coverage),
+        phase_products=phase_products,
+        fortinet_count=count_bits(product_mask),
+        third_party_count=count_bits(third_party_mask),
+        categories_covered=sum(1 for coverage in category_coverage if coverage.status != COVERAGE_NONE),
+        total_products=catalog.n_products,
+        total_categories=catalog.n_categories
+    )
+
+def _drop_catalog_memos(previous: CompiledCatalog, catalog: CompiledCatalog):
+    # Las entradas memoizadas retienen el catálogo anterior: se liberan al publicar uno nuevo
+    _score_masks.cache_clear()
+    _build_assessment_results.cache_clear()
+
+on_catalog_change(_drop_catalog_memos)
@@ -0,0 +1,291 @@
+"""Grilla de selección del paso 3 como un único componente (st.components.v2).
+
+Todas las categorías, productos Fortinet y soluciones de terceros se dibujan y
+se marcan en el navegador. La selección vuelve al servidor como un solo valor
+compacto (las dos máscaras en hexadecimal) después de una pausa sin clics, así
+que una ráfaga de cambios cuesta un único rerun.
+"""
+from typing import Callable, Dict, Optional, Tuple
+
+import streamlit as st
+
+from catalog import CompiledCatalog, current_catalog, on_catalog_change
+
+GRID_KEY = "assessment_selection_grid"
+# Pausa sin clics antes de enviar la selección; salir de la grilla la envía de inmediato
+SEND_DELAY_MS = 600
+
+_GRID_CSS = """
+:host { font-family: 'Inter', sans-serif; font-size: 14px; color: #1e293b; }
+.category-header {
+    background: linear-gradient(135deg, #3730a3 0%, #7c3aed 100%);
+    color: white;
+    padding: 0.875rem 1.25rem;
+    border-radius: 12px;
+    margin: 1.25rem 0 0.75rem 0;
+    text-align: center;
+    font-weight: 600;
+    font-size: 1rem;
+    box-shadow: 0 6px 12px rgba(55, 48, 163, 0.3);
+}
+.category-body { display: grid; grid-template-columns: 3fr 1fr; gap: 0.875rem; }
+.fortinet-section, .non-fortinet-section { border-radius: 12px; padding: 0.875rem 1rem; }
+.fortinet-section { background: linear-gradient(135deg, #fef2f2 0%, #fee2e2 100%); border: 2px solid #dc2626; }
+.non-fortinet-section { background: linear-gradient(135deg, #f0f9ff 0%, #dbeafe 100%); border: 2px solid #2563eb; }
+.fortinet-section h4, .non-fortinet-section h4 { font-size: 1rem; margin: 0 0 0.75rem 0; }
+.fortinet-section h4 { color: #dc2626; }
+.non-fortinet-section h4 { color: #2563eb; }
+.products { display: grid; grid-template-columns: 1fr 1fr; gap: 0.5rem 1rem; }
+label.toggle { display: flex; gap: 0.5rem; align-items: flex-start; cursor: pointer; font-size: 0.8rem; }
+label.toggle input { margin-top: 0.15rem; accent-color: #dc2626; }
+.non-fortinet-section label.toggle input { accent-color: #2563eb; }
+.caption { display: block; color: #64748b; font-size: 0.75rem; font-weight: 400; }
+.selected .caption { color: #15803d; }
+.status { margin-top: 0.75rem; padding: 0.5rem; border-radius: 8px; font-size: 0.8rem; text-align: center; }
+.status.hybrid, .status.fortinet { background: #dcfce7; color: #15803d; }
+.status.third-party { background: #dbeafe; color: #1d4ed8; }
+.status.none { background: #fee2e2; color: #b91c1c; }
+.sync { margin-top: 1rem; font-size: 0.75rem; color: #64748b; text-align: right; min-height: 1rem; }
+@media (max-width: 768px) {
+    .category-body, .products { grid-template-columns: 1fr; }
+}
+"""
+
+_GRID_JS = """
+const instances = new WeakMap();
+
+const STATUS = {
+    hybrid: "🔄 Ambiente Híbrido",
+    fortinet: "🛡️ Solo Fortinet",
+    "third-party": "🔧 Solo Terceros",
+    none: "⚠️ Sin Protección"
+};
+
+const parseMask = (hex) => BigInt("0x" + (hex || "0"));
+const bit = (position) => 1n << BigInt(position);
+
+function element(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+}
+
+function createGrid(parentElement) {
+    const grid = {
+        root: element("div", "selection-grid"),
+        products: 0n,
+        thirdParty: 0n,
+        dataSignature: null,
+        pending: false,
+        timer: null,
+        setStateValue: null,
+        sendDelay: 600,
+        productInputs: [],
+        categoryViews: []
+    };
+    parentElement.appendChild(grid.root);
+
+    grid.send = () => {
+        clearTimeout(grid.timer);
+        grid.timer = null;
+        if (!grid.pending) return;
+        grid.pending = false;
+        grid.sync.textContent = "";
+        grid.setStateValue("selection", {
+            products: grid.products.toString(16),
+            third_party: grid.thirdParty.toString(16)
+        });
+    };
+    grid.schedule = () => {
+        grid.pending = true;
+        grid.sync.textContent = "Cambios sin enviar…";
+        clearTimeout(grid.timer);
+        grid.timer = setTimeout(grid.send, grid.sendDelay);
+    };
+    // El usuario va hacia los botones de navegación: no hace falta esperar la pausa
+    grid.root.addEventListener("pointerleave", grid.send);
+    return grid;
+}
+
+function renderCategories(grid, categories) {
+    grid.root.replaceChildren();
+    grid.productInputs = [];
+    grid.categoryViews = [];
+
+    for (const category of categories) {
+        grid.root.appendChild(element("div", "category-header",
+            `${category.icon} ${category.name} - ${category.description}`));
+        const body = element("div", "category-body");
+        const fortinet = element("div", "fortinet-section");
+        fortinet.appendChild(element("h4", null, "🛡️ Productos Fortinet"));
+        const products = element("div", "products");
+        let categoryMask = 0n;
+
+        for (const product of category.products) {
+            categoryMask |= bit(product.index);
+            const label = element("label", "toggle");
+            label.title = product.description;
+            const input = element("input");
+            input.type = "checkbox";
+            const text = element("span");
+            text.appendChild(element("strong", null, product.name));
+            const caption = element("span", "caption");
+            text.appendChild(caption);
+            label.append(input, text);
+            products.appendChild(label);
+
+            const view = { product, input, label, caption };
+            input.addEventListener("change", () => {
+                grid.products = input.checked ? grid.products | bit(product.index) : grid.products & ~bit(product.index);
+                refresh(grid);
+                grid.schedule();
+            });
+            grid.productInputs.push(view);
+        }
+        fortinet.appendChild(products);
+
+        const others = element("div", "non-fortinet-section");
+        others.appendChild(element("h4", null, "🔧 Otras Soluciones"));
+        const label = element("label", "toggle");
+        label.title = `Incluye cualquier solución no-Fortinet en ${category.name}`;
+        const input = element("input");
+        input.type = "checkbox";
+        const text = element("span");
+        text.appendChild(element("strong", null, "Soluciones de Terceros"));
+        text.appendChild(element("span", "caption", `Tenemos otras tecnologías en ${category.name}`));
+        label.append(input, text);
+        const status = element("div", "status");
+        others.append(label, status);
+        input.addEventListener("change", () => {
+            grid.thirdParty = input.checked ? grid.thirdParty | bit(category.position) : grid.thirdParty & ~bit(category.position);
+            refresh(grid);
+            grid.schedule();
+        });
+        grid.categoryViews.push({ category, categoryMask, input, status });
+
+        body.append(fortinet, others);
+        grid.root.appendChild(body);
+    }
+    grid.sync = element("div", "sync");
+    grid.root.appendChild(grid.sync);
+}
+
+function refresh(grid) {
+    for (const view of grid.productInputs) {
+        const selected = (grid.products & bit(view.product.index)) !== 0n;
+        view.input.checked = selected;
+        view.label.classList.toggle("selected", selected);
+        view.caption.textContent = selected
+            ? `✅ ${view.product.nist_function} | Nivel ${view.product.maturity_level} | Fase ${view.product.implementation_phase}`
+            : `📝 ${view.product.description.slice(0, 50)}...`;
+    }
+    for (const view of grid.categoryViews) {
+        const hasFortinet = (grid.products & view.categoryMask) !== 0n;
+        const hasThirdParty = (grid.thirdParty & bit(view.category.position)) !== 0n;
+        view.input.checked = hasThirdParty;
+        const status = hasFortinet && hasThirdParty ? "hybrid"
+            : hasFortinet ? "fortinet" : hasThirdParty ? "third-party" : "none";
+        view.status.className = `status ${status}`;
+        view.status.textContent = STATUS[status];
+    }
+}
+
+export default function (component) {
+    const { data, parentElement, setStateValue } = component;
+    let grid = instances.get(parentElement);
+    if (!grid) {
+        grid = createGrid(parentElement);
+        instances.set(parentElement, grid);
+    }
+    grid.setStateValue = setStateValue;
+    grid.sendDelay = data.send_delay_ms;
+
+    if (grid.catalogVersion !== data.catalog_version) {
+        grid.catalogVersion = data.catalog_version;
+        renderCategories(grid, data.categories);
+        grid.dataSignature = null;
+    }
+    // Solo se adopta la selección del servidor cuando cambió (p. ej. nuevo assessment),
+    // nunca por encima de clics locales que todavía no se enviaron
+    const signature = `${data.products}/${data.third_party}`;
+    if (signature !== grid.dataSignature && !grid.pending) {
+        grid.dataSignature = signature;
+        grid.products = parseMask(data.products);
+        grid.thirdParty = parseMask(data.third_party);
+    }
+    refresh(grid);
+}
+"""
+
+_selection_grid_component = st.components.v2.component(
+    "nist_selection_grid",
+    css=_GRID_CSS,
+    js=_GRID_JS
+)
+
+_catalog_metadata: Dict[str, list] = {}
+
+def catalog_metadata(catalog: CompiledCatalog = None) -> list:
+    """Categorías y productos que dibuja la grilla; se arma una vez por versión de catálogo"""
+    catalog = catalog or current_catalog()
+    portfolio = catalog.portfolio
+    metadata = _catalog_metadata.get(catalog.version)
+    if metadata is None:
+        metadata = [
+            {
+                "name": category_name,
+                "position": catalog.category_position[category_name],
+                "icon": portfolio[category_name]["icon"],
+                "description": portfolio[category_name]["description"],
+                "products": [
+                    {
+                        "index": product.index,
+                        "name": product.name,
+                        "description": product.description,
+                        "nist_function": product.nist_function,
+                        "maturity_level": product.maturity_level,
+                        "implementation_phase": product.implementation_phase
+                    }
+                    for product in catalog.products_by_category[category_name]
+                ]
+            }
+            for category_name in catalog.categories
+        ]
+        _catalog_metadata[catalog.version] = metadata
+    return metadata
+
+on_catalog_change(lambda previous, catalog: _catalog_metadata.pop(previous.version, None))
+
+def encode_selection(product_mask: int, third_party_mask: int) -> Dict[str, str]:
+    return {"products": format(product_mask, "x"), "third_party": format(third_party_mask, "x")}
+
+def decode_selection(value: Optional[Dict], catalog: CompiledCatalog = None) -> Optional[Tuple[int, int]]:
+    """Máscaras enviadas por el navegador, recortadas al catálogo; None si el valor no es válido"""
+    if not isinstance(value, dict):
+        return None
+    catalog = catalog or current_catalog()
+    try:
+        product_mask = int(value.get("products") or "0", 16)
+        third_party_mask = int(value.get("third_party") or "0", 16)
+    except (TypeError, ValueError):
+        return None
+    if product_mask < 0 or third_party_mask < 0:
+        return None
+    return product_mask & ((1 << catalog.n_products) - 1), third_party_mask & ((1 << catalog.n_categories) - 1)
+
+def selection_grid(product_mask: int, third_party_mask: int, on_change: Callable[[], None]):
+    """Monta la grilla con la selección actual; `on_change` corre cuando llega una selección nueva"""
+    catalog = current_catalog()
+    data = {
+        "catalog_version": catalog.version,
+        "categories": catalog_metadata(catalog),
+        "send_delay_ms": SEND_DELAY_MS,
+        **encode_selection(product_mask, third_party_mask)
+    }
+    return _selection_grid_component(key=GRID_KEY, data=data, default={"selection": None},
+                                     on_selection_change=on_change)
+
+def submitted_selection() -> Optional[Tuple[int, int]]:
+    """Última selección enviada por la grilla en esta sesión"""
+    return decode_selection((st.session_state.get(GRID_KEY) or {}).get("selection"))
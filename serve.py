@@ -0,0 +1,69 @@
+"""Punto de entrada del servidor: la app de main.py, calentamiento al arrancar y caché de static/.
+
+    streamlit run serve.py            # o: uvicorn serve:app --port 8501
+
+Al iniciar se calienta el proceso en segundo plano (ver warmup.py); GET /readyz
+responde 503 mientras tanto y 200 cuando ya se puede enviar tráfico. También
+arranca el barrido que descarga a disco las sesiones inactivas (ver session_offload.py).
+
+El servidor de archivos estáticos de Streamlit no envía Cache-Control, así que el
+navegador revalida la hoja de estilos y la fuente en cada visita. Todo lo que se
+publica en static/ está versionado (app.css?v=<hash>, fuentes con la versión en
+el nombre), de modo que se puede marcar como inmutable por un año.
+"""
+from contextlib import asynccontextmanager
+
+import streamlit as st
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from session_offload import start_offloader
+from warmup import READINESS, start_warmup
+
+READY_PATH = "/readyz"
+
+STATIC_PREFIX = "/app/static/"
+IMMUTABLE = b"public, max-age=31536000, immutable"
+
+def is_versioned(path: str, query_string: bytes) -> bool:
+    if not path.startswith(STATIC_PREFIX):
+        return False
+    return path.startswith(STATIC_PREFIX + "fonts/") or b"v=" in query_string
+
+class StaticCacheMiddleware:
+    """Middleware ASGI: agrega Cache-Control a las respuestas versionadas de static/"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not is_versioned(scope["path"], scope.get("query_string", b"")):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache_control(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [(name, value) for name, value in message.get("headers", []) if name.lower() != b"cache-control"]
+                message = {**message, "headers": headers + [(b"cache-control", IMMUTABLE)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
+
+async def readiness(request):
+    snapshot = READINESS.snapshot()
+    return JSONResponse(snapshot, status_code=200 if READINESS.ready else 503,
+                        headers={"Cache-Control": "no-cache"})
+
+@asynccontextmanager
+async def lifespan(app):
+    start_warmup()
+    start_offloader()
+    yield
+
+app = st.App(
+    "main.py",
+    lifespan=lifespan,
+    routes=[Route(READY_PATH, readiness)],
+    middleware=[Middleware(StaticCacheMiddleware)]
+)
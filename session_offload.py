@@ -0,0 +1,227 @@
+"""Descarga a disco de sesiones inactivas y rehidratación en el próximo acceso.
+
+Una pestaña abierta y sin uso conserva en memoria del servidor su assessment y
+los acumuladores de scoring. En st.session_state.professional_assessment no va
+un dict sino un `OffloadableState`: se usa igual que el dict, pero su contenido
+lo puede mandar a disco el hilo que arranca serve.py. Cada
+NIST_SESSION_SWEEP_SECONDS ese hilo recorre los assessments vivos; los que
+llevan NIST_SESSION_IDLE_SECONDS sin un acceso guardan el dict serializado en
+una base SQLite local (NIST_SESSION_DB) y sueltan el dict y los acumuladores.
+El próximo acceso, desde cualquier run o fragmento, lo lee de vuelta; los
+acumuladores se reconstruyen desde las máscaras.
+
+El barrido nunca toca st.session_state ni el estado de los widgets: solo el
+contenido del propio `OffloadableState`, bajo su lock, el mismo que toma cada
+acceso del script. Las sesiones vivas se conocen por referencias débiles: cuando
+Streamlit descarta una sesión, su assessment desaparece del registro solo.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator, Optional
+
+SESSION_DB = os.environ.get("NIST_SESSION_DB", "sessions.db")
+IDLE_SECONDS = float(os.environ.get("NIST_SESSION_IDLE_SECONDS", "900"))
+SWEEP_SECONDS = float(os.environ.get("NIST_SESSION_SWEEP_SECONDS", "60"))
+# Filas sin assessment vivo (pestaña cerrada, otra réplica, reinicio) se borran pasado este plazo
+RETENTION_SECONDS = float(os.environ.get("NIST_SESSION_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+MASK_FIELDS = ("product_mask", "third_party_mask")
+
+def encode_state(state: Dict) -> str:
+    """JSON compacto del assessment; las máscaras van en hexadecimal"""
+    compact = dict(state)
+    for field in MASK_FIELDS:
+        compact[field] = format(compact.get(field) or 0, "x")
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+
+def decode_state(raw: str) -> Dict:
+    state = json.loads(raw)
+    for field in MASK_FIELDS:
+        state[field] = int(state.get(field) or "0", 16)
+    return state
+
+class OffloadStore:
+    """Assessments descargados por id de assessment; una conexión compartida bajo lock"""
+    def __init__(self, path: str = SESSION_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS offloaded_sessions "
+                    "(session_id TEXT PRIMARY KEY, saved_at REAL NOT NULL, state TEXT NOT NULL)"
+                )
+            self._connection = connection
+        return self._connection
+
+    def save(self, session_id: str, state: Dict):
+        with self._lock, self._connect() as connection:
+            connection.execute("INSERT OR REPLACE INTO offloaded_sessions VALUES (?, ?, ?)",
+                               (session_id, time.time(), encode_state(state)))
+
+    def pop(self, session_id: str) -> Optional[Dict]:
+        with self._lock, self._connect() as connection:
+            row = connection.execute("SELECT state FROM offloaded_sessions WHERE session_id = ?",
+                                     (session_id,)).fetchone()
+            if row is None:
+                return None
+            connection.execute("DELETE FROM offloaded_sessions WHERE session_id = ?", (session_id,))
+        return decode_state(row[0])
+
+    def prune(self, live_session_ids, older_than: float) -> int:
+        """Borra las filas sin assessment vivo guardadas antes de `older_than`"""
+        with self._lock, self._connect() as connection:
+            rows = connection.execute("SELECT session_id FROM offloaded_sessions WHERE saved_at < ?",
+                                      (older_than,)).fetchall()
+            stale = [(session_id,) for (session_id,) in rows if session_id not in live_session_ids]
+            connection.executemany("DELETE FROM offloaded_sessions WHERE session_id = ?", stale)
+        return len(stale)
+
+class OffloadableState(MutableMapping):
+    """Assessment de una sesión con la interfaz de un dict; el contenido puede vivir en disco mientras no se usa.
+
+    `scoring_state` guarda los acumuladores de la sesión: se sueltan junto con el
+    dict y se reconstruyen desde las máscaras.
+    """
+    def __init__(self, offloader: "SessionOffloader", data: Dict, default: Callable[[], Dict]):
+        self.id = uuid.uuid4().hex
+        self.scoring_state = None
+        self.last_active = time.monotonic()
+        self._offloader = offloader
+        self._default = default
+        self._data: Optional[Dict] = dict(data)
+        self._lock = threading.RLock()
+
+    def _loaded(self) -> Dict:
+        """Contenido en memoria, leído de disco si el barrido lo había descargado (con el lock tomado)"""
+        self.last_active = time.monotonic()
+        if self._data is None:
+            self._data = self._offloader.restore(self)
+        return self._data
+
+    @property
+    def offloaded(self) -> bool:
+        return self._data is None
+
+    def offload(self, idle_seconds: float) -> bool:
+        """Guarda el contenido en disco y lo suelta si no hubo accesos en `idle_seconds`"""
+        with self._lock:
+            if self._data is None or time.monotonic() - self.last_active < idle_seconds:
+                return False
+            self._offloader.store.save(self.id, self._data)
+            self._data = None
+            self.scoring_state = None
+            return True
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._loaded()[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._loaded()[key] = value
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._loaded()[key]
+
+    def __iter__(self) -> Iterator:
+        with self._lock:
+            return iter(list(self._loaded()))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._loaded())
+
+    def __repr__(self) -> str:
+        return f"OffloadableState({'<en disco>' if self.offloaded else self._data!r})"
+
+class SessionOffloader:
+    """Registro débil de los assessments vivos y barrido periódico de los inactivos"""
+    def __init__(self, store: OffloadStore, idle_seconds: float = IDLE_SECONDS):
+        self.store = store
+        self.idle_seconds = idle_seconds
+        self._states: "weakref.WeakValueDictionary[str, OffloadableState]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self.offloaded = 0
+        self.restored = 0
+        self.lost = 0
+        self.pruned = 0
+        self.last_error: Optional[str] = None
+
+    def track(self, data: Dict, default: Callable[[], Dict]) -> OffloadableState:
+        """Envuelve el assessment de una sesión; `default` lo reemplaza si la fila en disco ya no está"""
+        state = OffloadableState(self, data, default)
+        with self._lock:
+            self._states[state.id] = state
+        return state
+
+    def restore(self, state: OffloadableState) -> Dict:
+        try:
+            data = self.store.pop(state.id)
+        except sqlite3.Error as exc:
+            data = None
+            self.last_error = f"{type(exc).__name__}: {exc}"
+        with self._lock:
+            if data is None:
+                # Archivo borrado o ilegible: la sesión vuelve a empezar en vez de romperse
+                self.lost += 1
+            else:
+                self.restored += 1
+        return data if data is not None else state._default()
+
+    def sweep(self) -> int:
+        """Descarga los assessments sin accesos en `idle_seconds`; devuelve cuántos descargó"""
+        with self._lock:
+            states = list(self._states.values())
+        count = 0
+        for state in states:
+            try:
+                count += int(state.offload(self.idle_seconds))
+            except sqlite3.Error as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+        pruned = self.store.prune({state.id for state in states}, time.time() - RETENTION_SECONDS)
+        with self._lock:
+            self.offloaded += count
+            self.pruned += pruned
+        return count
+
+    def stats(self) -> Dict:
+        with self._lock:
+            states = list(self._states.values())
+            return {
+                "tracked": len(states),
+                "on_disk": sum(state.offloaded for state in states),
+                "offloaded": self.offloaded,
+                "restored": self.restored,
+                "lost": self.lost,
+                "pruned": self.pruned,
+                "error": self.last_error
+            }
+
+SESSION_OFFLOADER = SessionOffloader(OffloadStore())
+
+def _sweep_forever(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            SESSION_OFFLOADER.sweep()
+        except Exception as exc:
+            # El barrido nunca debe tumbar el hilo: se reintenta en el próximo intervalo
+            SESSION_OFFLOADER.last_error = f"{type(exc).__name__}: {exc}"
+
+def start_offloader(interval: float = SWEEP_SECONDS) -> threading.Thread:
+    thread = threading.Thread(target=_sweep_forever, args=(interval,), name="nist-session-offload", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,137 @@
+"""Plantillas HTML con clases para las secciones con muchas tarjetas.
+
+La hoja de estilos vive en static/app.css y se sirve como archivo estático: cada
+run emite solo un <link> versionado por contenido, y el navegador la descarga y
+la cachea una vez por sesión. Cada sección se arma con estas plantillas y se
+envía como un único elemento; los colores que dependen del dato van en la
+variable CSS --accent en lugar de repetir estilos inline en cada tarjeta.
+"""
+import hashlib
+import os
+from typing import Iterable
+
+import streamlit as st
+
+STYLESHEET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "app.css")
+# Ruta que publica Streamlit con server.enableStaticServing (ver .streamlit/config.toml)
+STYLESHEET_URL = "app/static/app.css"
+# Inter autoalojada (@font-face en app.css); el nombre lleva la versión, así que no cambia de contenido
+FONT_URL = "app/static/fonts/inter-3.19-latin.woff2"
+
+def _file_version(path: str) -> str:
+    with open(path, "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()[:12]
+
+STYLESHEET_VERSION = _file_version(STYLESHEET_PATH)
+
+def inject_styles():
+    """Un par de <link> por run en lugar de la hoja completa; la fuente se pide junto con la hoja"""
+    st.markdown(
+        f'<link rel="preload" href="{FONT_URL}" as="font" type="font/woff2" crossorigin>'
+        f'<link rel="stylesheet" href="{STYLESHEET_URL}?v={STYLESHEET_VERSION}">',
+        unsafe_allow_html=True
+    )
+
+def show(*parts: str):
+    """Envía las partes como un único elemento HTML"""
+    st.html("".join(parts))
+
+# ============ PASO 3 ============
+
+PROGRESS_CARDS = (
+    '<div class="card-grid cols-4">'
+    '<div class="metric-card"><h3 class="fortinet">{fortinet_count}</h3><p>Productos Fortinet</p></div>'
+    '<div class="metric-card"><h3 class="third-party">{third_party_count}</h3><p>Categorías con Terceros</p></div>'
+    '<div class="metric-card"><h3 class="coverage">{coverage_pct:.0f}%</h3><p>Cobertura Total</p></div>'
+    '<div class="metric-card"><h3 class="maturity">{overall_score:.1f}%</h3><p>Madurez Estimada</p></div>'
+    '</div>'
+)
+
+# ============ RESULTADOS ============
+
+BANNER = '<div class="banner {variant}"><{tag}>{title}</{tag}>{subtitle}</div>'
+BANNER_SUBTITLE = '<p>{text}</p>'
+
+def banner(variant: str, title: str, subtitle: str = "", tag: str = "h2") -> str:
+    return BANNER.format(variant=variant, tag=tag, title=title,
+                         subtitle=BANNER_SUBTITLE.format(text=subtitle) if subtitle else "")
+
+LEVEL_CARD = (
+    '<div class="kpi-card" style="--accent:#dc2626">'
+    '<h1>{level}</h1><h3>NIVEL ACTUAL</h3><p>{description}</p>'
+    '<div class="kpi-line" style="width:{score}%"></div>'
+    '<p class="kpi-highlight">{score:.1f}% de Madurez</p>'
+    '</div>'
+)
+
+INDUSTRY_CARD = (
+    '<div class="kpi-card" style="--accent:{color}">'
+    '<h1>{gap:+.0f}%</h1><h3>VS. INDUSTRIA</h3><p>{gap_text} del promedio</p>'
+    '<div class="kpi-bar"><div class="benchmark" style="width:{benchmark}%"></div>'
+    '<div class="score" style="width:{score}%"></div></div>'
+    '<p class="kpi-note">Benchmark: {benchmark:.1f}% | Usted: {score:.1f}%</p>'
+    '<p class="kpi-note">{source}</p>'
+    '</div>'
+)
+
+PEER_CARD = (
+    '<div class="kpi-card" style="--accent:{color}">'
+    '<h1>P{percentile:.0f}</h1><h3>VS. PARES</h3><p>Percentil entre {peers}</p>'
+    '<div class="kpi-line" style="width:{percentile:.0f}%"></div>'
+    '<p class="kpi-note">Función más rezagada: {weakest}</p>'
+    '<p class="kpi-note">{count:,} assessments comparados</p>'
+    '</div>'
+)
+
+ROI_CARD = (
+    '<div class="kpi-card" style="--accent:#16a34a">'
+    '<h1>{roi}</h1><h3>ROI POTENCIAL</h3><p>Siguiente nivel de madurez</p>'
+    '<div class="kpi-line" style="width:80%"></div>'
+    '<p class="kpi-highlight">Ahorro estimado anual</p>'
+    '</div>'
+)
+
+URGENCY_BOX = '<hr><div class="urgency-box" style="--accent:{color}"><h3>{title}</h3><p>{message}</p></div>'
+
+PHASE_TILE = (
+    '<div class="phase-tile {state}" style="--accent:{color}">'
+    '<div class="phase-number">{phase}</div>'
+    '<h4>{name}</h4>'
+    '<div class="phase-figures">'
+    '<p><strong>💰 Inversión:</strong><br>{investment}</p>'
+    '<p><strong>📈 ROI:</strong><br>{roi}</p>'
+    '<p><strong>⏱️ Payback:</strong><br>{payback}</p>'
+    '</div>'
+    '<p class="phase-status">{status}</p>'
+    '</div>'
+)
+
+BENEFITS_CARD = (
+    '<div class="benefits-card" style="--accent:{color}">'
+    '<h4>{title}</h4>'
+    '<p><strong>🎁 Sus Beneficios Actuales:</strong></p>'
+    '<ul>{benefits}</ul>'
+    '<p class="impact">{business_impact}</p>'
+    '{preview}'
+    '</div>'
+)
+
+NEXT_LEVEL_PREVIEW = '<div class="preview-note">💡 <strong>Vista Previa del Siguiente Nivel:</strong> {text}</div>'
+
+VALUE_CARD = '<div class="value-card" style="--accent:{color}"><h4>{title}</h4><ul>{items}</ul></div>'
+
+ACTION_CARD = (
+    '<div class="action-card" style="--accent:{color}">'
+    '<h3>{title}</h3>'
+    '<ol>{actions}</ol>'
+    '<div class="action-figures">'
+    '<p>💰 <strong>Inversión estimada:</strong> {investment}</p>'
+    '<p>📈 <strong>ROI esperado:</strong> {roi}</p>'
+    '</div>'
+    '</div>'
+)
+
+LIST_ITEM = '<li>{text}</li>'
+
+def list_items(texts: Iterable[str]) -> str:
+    return "".join(LIST_ITEM.format(text=text) for text in texts)
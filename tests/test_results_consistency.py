@@ -0,0 +1,136 @@
+"""Todas las secciones de resultados muestran los mismos números para una misma selección.
+
+Cada selección se renderiza con el AppTest headless de Streamlit: dashboard
+ejecutivo, análisis actual, roadmap por fases (con todas las fases abiertas) y
+estadísticas del roadmap. Los conteos y porcentajes de cada sección se comparan
+entre sí, con las tarjetas del paso 3 (ScoringState) y con el kernel escalar
+(score_masks).
+"""
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Los resultados del dashboard consultan los benchmarks: nada se lee ni se guarda en las bases reales
+SCRATCH_DIR = tempfile.mkdtemp(prefix="nist-tests-")
+os.environ["NIST_ASSESSMENT_DB"] = os.path.join(SCRATCH_DIR, "assessments.db")
+os.environ["NIST_BENCHMARK_PATH"] = os.path.join(SCRATCH_DIR, "industry_benchmarks.npz")
+
+from streamlit.testing.v1 import AppTest
+
+from catalog import current_catalog
+from scoring import ScoringState, score_masks
+
+CATALOG = current_catalog()
+INDUSTRY = next(iter(CATALOG.industries))
+COMPANY_SIZE = next(iter(CATALOG.company_sizes))
+ALL_PRODUCTS = (1 << CATALOG.n_products) - 1
+ALL_CATEGORIES = (1 << CATALOG.n_categories) - 1
+RUN_TIMEOUT = 60
+
+_random = random.Random(7)
+SELECTIONS = {
+    "empty": (0, 0),
+    "few_products": (0b101101, 0),
+    "third_party_only": (0, ALL_CATEGORIES),
+    "mixed": (0b101101, 0b11),
+    "random": (_random.getrandbits(CATALOG.n_products), _random.getrandbits(CATALOG.n_categories)),
+    "full_coverage": (ALL_PRODUCTS, ALL_CATEGORIES)
+}
+
+def teardown_module():
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+def results_page(product_mask: int, third_party_mask: int, industry: str, company_size: str):
+    """Script del AppTest: las secciones de resultados de main.py para una selección"""
+    import streamlit as st
+
+    import main
+    from scoring import build_assessment_results
+
+    st.session_state.professional_assessment = {
+        "step": 4,
+        "industry": industry,
+        "company_size": company_size,
+        "product_mask": product_mask,
+        "third_party_mask": third_party_mask,
+        "assessment_complete": True
+    }
+    for phase in main.current_catalog().phases:
+        st.session_state[f"phase_roadmap_{phase}"] = True
+    results = build_assessment_results(product_mask, third_party_mask)
+    main.show_executive_dashboard(results)
+    main.show_current_analysis(results)
+    main.show_phase_roadmap(results)
+    main.show_roadmap_statistics(results)
+
+def render(product_mask: int, third_party_mask: int) -> AppTest:
+    at = AppTest.from_function(results_page, args=(product_mask, third_party_mask, INDUSTRY, COMPANY_SIZE),
+                               default_timeout=RUN_TIMEOUT)
+    at.run()
+    assert not at.exception, at.exception[0].message
+    return at
+
+def dashboard_numbers(at: AppTest) -> dict:
+    html = "".join(element.proto.body for element in at.get("html"))
+    return {
+        "level": int(re.search(r"<h1>(\d+)</h1><h3>NIVEL ACTUAL", html).group(1)),
+        "score": re.search(r"([\d.]+)% de Madurez", html).group(1),
+        "industry_score": re.search(r"Usted: ([\d.]+)%", html).group(1)
+    }
+
+def phase_lines(at: AppTest) -> list:
+    return [element.value for element in at.markdown if element.value.startswith(("✅", "⭕"))]
+
+@pytest.mark.parametrize("name", list(SELECTIONS))
+def test_sections_report_the_same_numbers(name):
+    product_mask, third_party_mask = SELECTIONS[name]
+    at = render(product_mask, third_party_mask)
+    metrics = {metric.label: metric for metric in at.metric}
+    dashboard = dashboard_numbers(at)
+    lines = phase_lines(at)
+
+    scalar = score_masks(product_mask, third_party_mask, CATALOG)
+    cards = ScoringState.from_masks(product_mask, third_party_mask, CATALOG)
+    level = scalar["maturity_level"]
+    score = f"{scalar['overall_score']:.1f}"
+    fortinet_count = bin(product_mask).count("1")
+    total_products = CATALOG.n_products
+    total_categories = CATALOG.n_categories
+
+    # Nivel y puntaje: dashboard, análisis actual y tarjetas del paso 3
+    assert dashboard["level"] == level
+    assert dashboard["score"] == dashboard["industry_score"] == score
+    assert metrics["Madurez General"].value == f"Nivel {level}"
+    assert metrics["Madurez General"].delta == f"{score}%"
+    assert f"{cards.results()['overall_score']:.1f}" == score
+
+    # Productos Fortinet: análisis actual, estadísticas, roadmap por fases y tarjetas del paso 3
+    assert cards.fortinet_count == fortinet_count
+    assert metrics["Productos Fortinet"].value == f"{fortinet_count}/{total_products}"
+    assert metrics["Productos Totales"].value == str(total_products)
+    assert metrics["Productos Implementados"].value == str(fortinet_count)
+    assert metrics["Productos Implementados"].delta == f"{fortinet_count / total_products * 100:.1f}% completado"
+    assert len(lines) == total_products
+    assert sum(line.startswith("✅") for line in lines) == fortinet_count
+
+    # Categorías: análisis actual, estadísticas y tarjetas del paso 3
+    assert metrics["Categorías con Terceros"].value == f"{cards.third_party_count}/{total_categories}"
+    assert metrics["Cobertura de Categorías"].value == f"{cards.categories_covered}/{total_categories}"
+    assert metrics["Cobertura de Categorías"].delta == f"{cards.categories_covered / total_categories * 100:.0f}%"
+
+    # Próxima fase: la fase marcada como siguiente en el roadmap y la tarjeta de estadísticas
+    next_phase = [expander.label for expander in at.expander if "SIGUIENTE FASE" in expander.label]
+    next_phase_products = len(CATALOG.products_by_phase.get(level + 1, ()))
+    assert metrics["Próxima Fase"].value == str(next_phase_products)
+    if level + 1 in CATALOG.phases:
+        assert next_phase == [f"Fase {level + 1}: {CATALOG.phases[level + 1]['name']} - 🎯 SIGUIENTE FASE"]
+    else:
+        assert next_phase == []
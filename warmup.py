@@ -0,0 +1,130 @@
+"""Calentamiento al arrancar el servidor y estado de readiness para el orquestador.
+
+serve.py lanza `start_warmup()` en un hilo al iniciar: importa el stack de la
+página de resultados, deja listos los índices del catálogo, los benchmarks por
+segmento, las secciones narrativas de los 5 niveles y el esqueleto del roadmap,
+y recién entonces marca el proceso como listo. El orquestador consulta
+GET /readyz (503 mientras calienta, 200 al terminar) o, si se define
+NIST_READY_FILE, espera a que exista ese archivo.
+"""
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+READY_FILE = os.environ.get("NIST_READY_FILE")
+
+def _catalog_indexes():
+    from catalog import current_catalog
+    from scoring import score_masks
+    from selection_grid import catalog_metadata
+
+    # Lee, valida y compila data/catalog.json
+    catalog = current_catalog()
+    catalog_metadata(catalog)
+    # Primer uso de los kernels de scoring con el catálogo compilado
+    score_masks(0, 0, catalog)
+    score_masks((1 << catalog.n_products) - 1, (1 << catalog.n_categories) - 1, catalog)
+
+def _industry_benchmarks():
+    from industry_benchmarks import industry_benchmarks
+
+    # Sketches guardados más las filas de SQLite posteriores al último guardado
+    industry_benchmarks()
+
+def _results_stack():
+    import pandas as pd
+    from streamlit import dataframe_util
+
+    # Conversión pandas -> Arrow que hace st.dataframe en la pestaña de análisis (pyarrow llega con Streamlit)
+    dataframe_util.convert_pandas_df_to_arrow_bytes(pd.DataFrame({"Categoría": ["-"], "Estado": ["-"]}))
+
+def _narrative_sections():
+    from narratives import narrative_sections
+
+    for level in range(1, 6):
+        narrative_sections(level)
+
+def _roadmap_skeleton():
+    from roadmap_chart import build_roadmap_figure, roadmap_skeleton
+    from scoring import build_assessment_results
+
+    roadmap_skeleton()
+    # Una figura descartada: carga los validadores de Plotly y el serializador JSON
+    build_roadmap_figure(build_assessment_results(0, 0)).to_json()
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("catalog_indexes", _catalog_indexes),
+    ("industry_benchmarks", _industry_benchmarks),
+    ("results_stack", _results_stack),
+    ("narrative_sections", _narrative_sections),
+    ("roadmap_skeleton", _roadmap_skeleton)
+]
+
+class Readiness:
+    """Estado del calentamiento, compartido entre el hilo que calienta y el endpoint"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "starting"
+        self.steps_ms: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            total_ms = (self.ready_at - self.started_at) * 1000 if self.ready_at and self.started_at else None
+            return {
+                "status": self.state,
+                "steps_ms": dict(self.steps_ms),
+                "total_ms": round(total_ms, 1) if total_ms is not None else None,
+                "errors": dict(self.errors)
+            }
+
+    def run(self, steps: List[Tuple[str, Callable[[], None]]] = WARMUP_STEPS):
+        with self._lock:
+            self.state = "warming"
+            self.started_at = time.perf_counter()
+        for name, step in steps:
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as exc:
+                # Un paso que falla no debe dejar al pod fuera de servicio ni saltear los siguientes:
+                # solo esa parte queda en frío
+                with self._lock:
+                    self.errors[name] = f"{type(exc).__name__}: {exc}"
+                continue
+            with self._lock:
+                self.steps_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+        with self._lock:
+            self.state = "ready"
+            self.ready_at = time.perf_counter()
+        _write_ready_file(self.snapshot())
+
+READINESS = Readiness()
+
+def _write_ready_file(snapshot: Dict):
+    if not READY_FILE:
+        return
+    temporary = f"{READY_FILE}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(snapshot, handle)
+    # Renombrar es atómico: quien espera el archivo nunca lo ve a medio escribir
+    os.replace(temporary, READY_FILE)
+
+def clear_ready_file():
+    if READY_FILE and os.path.exists(READY_FILE):
+        os.remove(READY_FILE)
+
+def start_warmup() -> threading.Thread:
+    """Calienta en segundo plano: el servidor acepta conexiones (y /_stcore/health responde) mientras tanto"""
+    clear_ready_file()
+    thread = threading.Thread(target=READINESS.run, name="nist-warmup", daemon=True)
+    thread.start()
+    return thread